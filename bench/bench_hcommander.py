@@ -0,0 +1,193 @@
+import sys, os, time, json, random, argparse, gc, logging
+import stubs
+stubs.install()
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ["HCOMMANDER_PROFILE"] = "1" # filter and sort are timed by the commander's own profiler
+
+from PySide2 import QtCore, QtWidgets
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+import hcommander
+from hcommander import LabelIndex, CompositeModel, AutoCompleteModel, InputField, AutoCompleteRole, SortKeyRole, AlignmentRole
+
+"""
+Benchmarks for the commander's matcher, run outside Houdini against stub Houdini modules (see stubs.py)
+but with the real PySide2 and numpy. For each catalog size it replays typing sequences against the
+AutoCompleteModel, through the same calls the commander makes (filter, flush, rowCount, data), and reports
+per-keystroke latency percentiles for three phases:
+
+    filter     matching the query against every label, as logged by the commander's profiler
+    sort       publishing the result: ordering (and aligning) the first batch, as logged by the profiler
+    highlight  reading the alignment of every row in view and formatting it (AlignmentRole + InputField.format)
+
+    python2.7 bench/bench_hcommander.py              # compare against bench/baseline.json
+    python2.7 bench/bench_hcommander.py --save       # record a new baseline
+
+Catalogs and typing are generated from a fixed seed so runs are comparable across changes. Timings in a
+baseline are only meaningful on the machine that recorded it.
+"""
+
+sizes = [1000, 5000, 10000, 50000]
+phases = ['filter', 'sort', 'highlight']
+baselinefile = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Words that node type descriptions are made of, roughly weighted the way Houdini's are
+prefixes = ["", "", "", "", "Labs ", "RBD ", "Vellum ", "Pyro ", "FLIP ", "Crowd ", "KineFX ", "MOPs ", "Karma ", "USD "]
+words = ["Attribute", "Wrangle", "Transform", "Merge", "Group", "Point", "Primitive", "Vertex", "Volume", "VDB",
+    "Poly", "Extrude", "Bevel", "Reduce", "Split", "Curve", "Resample", "Sweep", "Copy", "to", "Points",
+    "Blast", "Delete", "Fuse", "Clean", "Normal", "Scatter", "Noise", "Mountain", "Smooth", "Relax", "Boolean",
+    "Fracture", "Constraint", "Solver", "Source", "Rasterize", "Convert", "Trail", "Sort", "Match", "Size",
+    "Bound", "Box", "Sphere", "Grid", "Tube", "Torus", "Line", "Circle", "File", "Cache", "Object", "Switch",
+    "Null", "Output", "Subnet", "For", "Each", "Begin", "End", "Promote", "Rename", "Blend", "Shape", "Skin",
+    "Edge", "Divide", "Facet", "Peak", "Ray", "Remesh", "Triangulate", "UV", "Flatten", "Layout", "Project",
+    "Texture", "Color", "Visualize", "Measure", "Connectivity", "Partition", "Pack", "Unpack", "Instance"]
+suffixes = ["", "", "", "", " 2.0", " 3.0", " Old", " Lite", " SOP", " Tool"]
+
+def catalog(size, seed=0):
+    """ size distinct, node-type-like labels """
+    rng = random.Random(seed)
+    seen = set()
+    labels = []
+    while len(labels) < size:
+        label = rng.choice(prefixes) + " ".join(rng.choice(words) for _ in range(rng.choice([1, 1, 2, 2, 2, 3]))) + rng.choice(suffixes)
+        if label in seen: label += " %d" % len(labels)
+        seen.add(label)
+        labels.append(label)
+    return labels
+
+def typing(labels, count, seed=1):
+    """ Keystroke sequences the way people type into the commander: the start of each word of the label
+        they want, sometimes overshooting a character and backspacing. Each sequence is a list of texts. """
+    rng = random.Random(seed)
+    sequences = []
+    for _ in range(count):
+        target = rng.choice(labels)
+        keys = "".join(word[:rng.choice([1, 2, 3, 4])] for word in target.split())
+        text = ""; sequence = []
+        for key in keys:
+            if rng.random() < 0.1:
+                sequence.append(text + rng.choice("abcdefghijklmnopqrstuvwxyz"))
+            text += key.lower()
+            sequence.append(text)
+        sequences.append(sequence)
+    return sequences
+
+class LabelModel(QtCore.QAbstractListModel):
+    """ A node type model without the node types: just the labels, as the catalog would provide them """
+    def __init__(self, labels, parent=None):
+        super(LabelModel, self).__init__(parent)
+        self._labels = [[label] for label in labels]
+        self._index = LabelIndex(self._labels)
+
+    def rowCount(self, parentindex=None):
+        return len(self._labels)
+
+    def data(self, index, role):
+        if role == AutoCompleteRole: return self._labels[index.row()]
+        elif role == SortKeyRole: return 1
+        return None
+
+    def labels(self):
+        return self._labels
+
+    def sort_keys(self):
+        return [1] * len(self._labels)
+
+    def label_index(self):
+        return self._index
+
+    def index_of(self, item):
+        return None
+
+    def callback(self, index, hcommander, list):
+        pass
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    if not samples: return 0.0
+    return samples[min(len(samples) - 1, int(round(p / 100.0 * (len(samples) - 1))))]
+
+class Records(logging.Handler):
+    """ Collects the profiler's per-keystroke records """
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(json.loads(record.getMessage()))
+
+def run(size, sequences):
+    labels = catalog(size)
+    model = CompositeModel([LabelModel(labels)])
+    records = Records()
+    log = logging.getLogger("hcommander.profile")
+    log.addHandler(records)
+    timings = dict((phase, []) for phase in phases)
+    clock = time.time if sys.platform != 'win32' else time.clock
+    try:
+        for sequence in typing(labels, sequences):
+            # every sequence starts from a freshly opened commander
+            proxy = AutoCompleteModel()
+            proxy.setSourceModel(model)
+            for text in sequence:
+                if LabelIndex.bitset(text.upper()) == 0: continue
+                hcommander.profiler.begin(text)
+                proxy.filter(text)
+                proxy.flush()
+                start = clock()
+                for row in range(proxy.rowCount()):
+                    index = proxy.index(row)
+                    InputField.format(index.data(AutoCompleteRole)[0], index.data(AlignmentRole))
+                timings['highlight'].append(clock() - start)
+            hcommander.profiler.end()
+    finally:
+        log.removeHandler(records)
+    for record in records.records:
+        timings['filter'].append(record['filter_ms'] / 1000)
+        timings['sort'].append(record['sort_ms'] / 1000)
+    return dict((phase, {
+        'p50': percentile(samples, 50) * 1000,
+        'p95': percentile(samples, 95) * 1000,
+        'keystrokes': len(samples)}) for phase, samples in timings.items())
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hcommander matcher")
+    parser.add_argument('--sizes', type=int, nargs='+', default=sizes)
+    parser.add_argument('--sequences', type=int, default=50, help="typing sequences replayed per catalog")
+    parser.add_argument('--save', action='store_true', help="record the results as the new baseline")
+    parser.add_argument('--baseline', default=baselinefile)
+    parser.add_argument('--tolerance', type=float, default=0.2, help="slowdown over the baseline that counts as a regression")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    print "%8s %-10s %10s %10s %10s %10s" % ("labels", "phase", "p50 ms", "p95 ms", "base p50", "base p95")
+    for size in args.sizes:
+        gc.collect()
+        result = results[str(size)] = run(size, args.sequences)
+        for phase in phases:
+            stats = result[phase]
+            base = baseline.get(str(size), {}).get(phase)
+            print "%8d %-10s %10.3f %10.3f %10s %10s" % (size, phase, stats['p50'], stats['p95'],
+                "%.3f" % base['p50'] if base else "-", "%.3f" % base['p95'] if base else "-")
+            if base and not args.save:
+                for p in ('p50', 'p95'):
+                    if stats[p] > base[p] * (1 + args.tolerance):
+                        regressions.append("%d labels, %s %s: %.3fms vs %.3fms" % (size, phase, p, stats[p], base[p]))
+
+    if args.save:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print "Saved baseline to", args.baseline
+    elif regressions:
+        print "\nRegressions over the baseline:"
+        for regression in regressions: print "  " + regression
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+import sys, os, types, shutil, tempfile
+
+"""
+Just enough of Houdini's Python modules for hcommander to import outside of Houdini. Anything not
+spelled out here is a Stub: every attribute of a Stub is another Stub, calling one returns a Stub,
+and you can subclass one (hcursor and hcommander derive from nodegraph classes at import time).
+PySide2 and numpy are NOT stubbed; the benchmarks measure them for real.
+"""
+
+class Stub(type):
+    def __getattr__(cls, name):
+        if name.startswith('__'): raise AttributeError(name)
+        stub = Stub(name, (object,), {})
+        setattr(cls, name, stub)
+        return stub
+
+    def __call__(cls, *args, **kwargs):
+        return cls
+
+class StubModule(types.ModuleType):
+    def __getattr__(self, name):
+        if name.startswith('__'): raise AttributeError(name)
+        stub = Stub(name, (object,), {})
+        setattr(self, name, stub)
+        return stub
+
+modules = ['hou', 'hdefereval', 'nodegraph', 'nodegraphbase', 'nodegraphautoscroll', 'nodegraphutils',
+    'nodegraphview', 'canvaseventtypes', 'houdinihelp', 'houdinihelp.server', 'houdinihelp.api']
+
+def install(prefdir=None):
+    """ Put the stubs in sys.modules and point HOUDINI_USER_PREF_DIR at a scratch copy of the config files """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if not prefdir:
+        prefdir = tempfile.mkdtemp(prefix="hcommander_bench")
+        shutil.copy(os.path.join(root, "hcommander.csv"), prefdir)
+        shutil.copy(os.path.join(root, "hotkeys.csv"), prefdir)
+
+    for name in modules:
+        sys.modules[name] = StubModule(name)
+    for name in modules:
+        if '.' in name:
+            package, module = name.rsplit('.', 1)
+            setattr(sys.modules[package], module, sys.modules[name])
+
+    hou = sys.modules['hou']
+    hou.session = types.ModuleType('hou.session')
+    hou.getenv = lambda name, default=None: prefdir if name == 'HOUDINI_USER_PREF_DIR' else os.environ.get(name, default)
+    hou.applicationVersionString = lambda: "bench"
+    hou.OperationFailed = type('OperationFailed', (Exception,), {})
+    hou.NotAvailable = type('NotAvailable', (Exception,), {})
+
+    sys.path.insert(0, os.path.join(root, "python2.7libs"))
+    return prefdir
@@ -1,7 +1,9 @@
-import hou, nodegraph, os, csv, sys, traceback, math, houdinihelp, weakref, inspect
+import hou, nodegraph, os, csv, sys, traceback, math, houdinihelp, weakref, inspect, heapq, bisect, threading, json, time
+import logging, logging.handlers, fnmatch, re
+import numpy
 import utility_ui, hcursor
 from hou import parmTemplateType
-from collections import defaultdict
+from collections import defaultdict, OrderedDict, deque
 import nodegraphbase as base
 from canvaseventtypes import *
 from PySide2 import QtCore, QtWidgets, QtGui
@@ -26,8 +28,16 @@ NodeTypeRole     = Qt.UserRole + 4
 SortKeyRole      = Qt.UserRole + 5
 ActionRole       = Qt.UserRole + 6
 IconRole         = Qt.UserRole + 7
+AlignmentRole    = Qt.UserRole + 8
+ValueRole        = Qt.UserRole + 9
+SiblingsRole     = Qt.UserRole + 10
 
 this.window = None
+# nodegraphhooks reloads this module when it changes: destroy the windows pooled by the previous version
+for pooled in getattr(this, 'windows', {}).values():
+    if pooled._node_types is not None: pooled._node_types.detach()
+    pooled.deleteLater()
+this.windows = {} # category name -> hidden HCommanderWindow, reused every time the commander opens there
 def reset_state(): this.window = None
 
 def handleEvent(uievent, pending_actions):
@@ -36,42 +46,78 @@ def handleEvent(uievent, pending_actions):
         return this, result
     else:
         if uievent.eventtype == 'keydown' and uievent.key == 'Space':
-            this.window = HCommanderWindow(uievent.editor, volatile=True, selection=hou.selectedNodes())
+            open_window(uievent.editor, volatile=True, selection=hou.selectedNodes())
         elif uievent.eventtype == 'keyhit' and uievent.key == 'Ctrl+Space':
-            this.window = HCommanderWindow(uievent.editor, volatile=False, selection=hou.selectedNodes())
+            open_window(uievent.editor, volatile=False, selection=hou.selectedNodes())
         elif uievent.eventtype == 'keyhit' and uievent.key == 'Shift+Tab':
-            this.window = HCommanderWindow(uievent.editor, volatile=False, selection=[uievent.editor.pwd()])
+            open_window(uievent.editor, volatile=False, selection=[uievent.editor.pwd()])
         else:
             return None, False
-        this.window.finished.connect(reset_state)
-        this.window.show()
         return this, True
 
 def edit(editor, parm_tuple):
     assert not this.window
-    this.window = HCommanderWindow(editor, volatile=False, selection=[parm_tuple.node()], item=parm_tuple)
-    this.window.finished.connect(reset_state)
-    window.show()
+    open_window(editor, volatile=False, selection=[parm_tuple.node()], item=parm_tuple)
+
+def open_window(editor, volatile, selection, item=None):
+    node = selection[0] if len(selection) == 1 else None
+    category = node.childTypeCategory() if node else None
+    key = category.name() if category else None
+    if key not in this.windows:
+        this.windows[key] = HCommanderWindow(category)
+        this.windows[key].finished.connect(reset_state)
+    this.window = this.windows[key]
+    this.window.present(editor, volatile, selection, item)
     
 class HCommanderWindow(QtWidgets.QDialog):
+    """
+    Windows are pooled per network category and hidden rather than destroyed when closed, so the node
+    type models, their indexes, the views and the stylesheet are built only once. Each time the window
+    is presented only the parts that depend on the selection (parms and actions) are rebuilt.
+    """
     width = 700
     
-    def __init__(self, editor, volatile=False, selection=hou.selectedNodes(), item=None):
+    def __init__(self, category):
         super(HCommanderWindow, self).__init__(hou.qt.mainWindow())
-        self.setAttribute(QtCore.Qt.WA_DeleteOnClose) # NECESSARY TO AVOID LEAKING MEMORY
-        self._volatile = volatile
-        self.editor = editor
+        self._volatile = None
+        self.editor = None
         self.setMinimumWidth(HCommanderWindow.width)
         self.setMinimumHeight(400)
-        # Popups steal events, allowing us to receive the the space keyup to terminate volatile mode.
-        # However, it swallows useful events in non-volatile mode. THIS FIXES BUG: ctrl-space, escape, space -- opens once but should twice.
-        windowflag = Qt.Popup if self._volatile else Qt.Tool
-        self.setWindowFlags(windowflag | Qt.FramelessWindowHint | Qt.X11BypassWindowManagerHint)
         self.setWindowOpacity(0.95)
 
-        self._setup_models(editor, selection)
+        self._category_type = category
+        self._node_types = NodeTypeModel(category) if category else None
+        self._parms = None
+        self._model = CompositeModel([])
+        self._proxy_model = AutoCompleteModel()
+        self._proxy_model.setSourceModel(self._model)
+        self._proxy_model.filtered.connect(self._filtered)
+        self.finished.connect(self._proxy_model.cancel)
+        self.finished.connect(lambda _: NodeTypeModel.tooltips.save())
+        self.finished.connect(lambda _: this.profiler.end())
+        self.finished.connect(lambda _: self._detach())
+        self._category = category.name() if category else None
         self._setup_ui()
 
+    def present(self, editor, volatile=False, selection=(), item=None):
+        self.editor = editor
+        if volatile != self._volatile:
+            self._volatile = volatile
+            # Popups steal events, allowing us to receive the the space keyup to terminate volatile mode.
+            # However, it swallows useful events in non-volatile mode. THIS FIXES BUG: ctrl-space, escape, space -- opens once but should twice.
+            windowflag = Qt.Popup if self._volatile else Qt.Tool
+            self.setWindowFlags(windowflag | Qt.FramelessWindowHint | Qt.X11BypassWindowManagerHint)
+
+        self._textbox.blockSignals(True)
+        self._textbox.clear()
+        self._textbox.blockSignals(False)
+        self._setup_models(editor, selection)
+        hou.session._hcommander_saved.refresh()
+        hou.session._hcommander_saved.watch()
+        self._saved.setVisible(bool(hou.session._hcommander_saved.rowCount()))
+        self.show()
+        self._textbox.setFocus()
+
         if item:
             index = self.list.model().index_of(item)
             self.list.setCurrentIndex(index)
@@ -80,20 +126,30 @@ class HCommanderWindow(QtWidgets.QDialog):
     def _setup_models(self, editor, selection):
         node = selection[0] if len(selection) == 1 else None
         models = []
+        self._detach()
+        if len(selection) > 1 and all(other.type() == selection[0].type() for other in selection):
+            # Edit the parms every selected node shares; edits are shown on the first and written to all of them
+            self._parms = ParmTupleModel(ParmTupleModel._filter(selection[0].parmTuples()), watch=True, siblings=selection[1:])
+            models.append(self._parms)
         if node:
             if node != editor.pwd():
-                ptm = ParmTupleModel(ParmTupleModel._filter(node.parmTuples()))
-                models.append(ptm)
+                self._parms = ParmTupleModel(ParmTupleModel._filter(node.parmTuples()), watch=True)
+                models.append(self._parms)
             am = Action.find(node)
-            category = node.childTypeCategory()
-            if category:
-                ntm = NodeTypeModel(category.nodeTypes())
-                models.append(ntm)
+            if self._node_types and self._node_types.catalog is not NodeTypeCatalog.of(self._category_type):
+                # node types were installed, uninstalled or hidden since this window was built
+                self._node_types.detach()
+                self._node_types = NodeTypeModel(self._category_type)
+            if self._node_types:
+                models.append(self._node_types)
+                this.pixmaps.prewarm(self._node_types.icon_names(), hou.ui.scaledSize(InputField.icon_size))
             models.append(ActionModel(am))
-        self._model = CompositeModel(models)
-        self._proxy_model = AutoCompleteModel()
-        self._proxy_model.setSourceModel(self._model)
-        self._proxy_model.sort(0, Qt.AscendingOrder)
+        self._model.set_models(models)
+
+    def _detach(self):
+        if self._parms is not None: self._parms.detach()
+        self._parms = None
+        hou.session._hcommander_saved.detach()
 
     def _setup_ui(self):
         self.setStyleSheet(hou.qt.styleSheet())
@@ -116,6 +172,7 @@ class HCommanderWindow(QtWidgets.QDialog):
         list.setItemDelegate(item_delegate) 
         list.setSelectionMode(QAbstractItemView.SingleSelection)
         list.setFocusPolicy(Qt.NoFocus)
+        list.verticalScrollBar().valueChanged.connect(lambda _: self._prefetch())
         self.list = list
 
         layout = QtWidgets.QVBoxLayout()
@@ -139,8 +196,12 @@ class HCommanderWindow(QtWidgets.QDialog):
         sizepolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Preferred, QtWidgets.QSizePolicy.Maximum)
         saved.setSizePolicy(sizepolicy)
         self._saved = saved
-        if not hou.session._hcommander_saved.parm_tuples:
-            saved.setVisible(False)
+
+        hud = QtWidgets.QLabel(self)
+        hud.setStyleSheet("font-size: 10px; color: darkgray")
+        hud.setVisible(Profiler.enabled)
+        this.profiler.updated.connect(hud.setText)
+        layout.addWidget(hud)
 
     def handleEvent(self, uievent, pending_actions):
         if self._volatile and uievent.eventtype == 'keyup' and uievent.key == 'Space':
@@ -152,12 +213,12 @@ class HCommanderWindow(QtWidgets.QDialog):
 
     def saveItem(self, index):
         hou.session._hcommander_saved.append(index.data(ParmTupleRole))
-        if hou.session._hcommander_saved.parm_tuples:
+        if hou.session._hcommander_saved.rowCount():
             self._saved.setVisible(True)
 
     def unsaveItem(self, index):
         hou.session._hcommander_saved.remove(index.data(ParmTupleRole))
-        if not hou.session._hcommander_saved.parm_tuples:
+        if not hou.session._hcommander_saved.rowCount():
             self._saved.setVisible(False)
 
     def eventFilter(self, obj, event):
@@ -173,10 +234,23 @@ class HCommanderWindow(QtWidgets.QDialog):
         return False
 
     def _text_changed(self, text):
+        this.profiler.begin(text, category=self._category)
         self._proxy_model.filter(text)
-        self.list.itemDelegate().filter(text)
+
+    def _filtered(self):
         index = self.list.model().index(0, 0)
         self.list.setCurrentIndex(index)
+        self._prefetch()
+
+    def _prefetch(self):
+        """ Queue tooltips for the rows likely to show next: the top results and the page past the scroll position """
+        model = self.list.model()
+        page = max(1, self.list.viewport().height() // self.list.sizeHintForRow(0)) if model.rowCount() else 0
+        first = max(0, self.list.indexAt(QtCore.QPoint(0, 0)).row())
+        rows = range(min(page, model.rowCount())) + range(first, min(first + 2 * page, model.rowCount()))
+        # the most recent request is served first, so queue the most likely rows last
+        for row in reversed(rows):
+            model.index(row, 0).data(Qt.WhatsThisRole)
     
     def _handle_keys(self, event):
         key = event.key()
@@ -198,6 +272,7 @@ class HCommanderWindow(QtWidgets.QDialog):
         self.list.setCurrentIndex(index)
         
     def accept(self, list=None):
+        self._proxy_model.flush()
         list = list or self.list
         if not list.selectedIndexes():
             self.reject()
@@ -213,48 +288,141 @@ class HCommanderWindow(QtWidgets.QDialog):
             if not self.isActiveWindow():
                 self.close()
 
+class LRUCache(object):
+    """ A dict that forgets its least recently used entries once their total `cost` exceeds `capacity` """
+    def __init__(self, capacity, items=(), cost=lambda value: 1):
+        self.capacity = capacity
+        self.total = 0
+        self._cost = cost
+        self._items = OrderedDict()
+        for key, value in items: self[key] = value
+
+    def get(self, key, default=None):
+        if key not in self._items: return default
+        value = self._items.pop(key)
+        self._items[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self._items:
+            self.total -= self._cost(self._items.pop(key))
+        self._items[key] = value
+        self.total += self._cost(value)
+        while self.total > self.capacity and len(self._items) > 1:
+            _, evicted = self._items.popitem(last=False)
+            self.total -= self._cost(evicted)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def items(self):
+        return self._items.items()
+
 class ItemDelegate(QStyledItemDelegate):
     windowClosed = QtCore.Signal(object)
+    spacing = 6
+    field_height = 20
+    sublabel_height = 12
+    # laid out rich text, keyed by (html, font, width), shared by every row
+    _texts = LRUCache(2048)
 
     def __init__(self, parent=None):
         super(ItemDelegate, self).__init__(parent)
-        self._filter = None
         self.triggering_event = None
         self.closeEditor.connect(self._closeEditor)
+        self._field_background = hou.qt.getColor("PaneEmptyBG")
+        self._preview = PreviewWriter(self.valueChanged, self)
 
     def sizeHint(self, option, index):
         return QtCore.QSize(0, 50)
 
-    def filter(self, text):
-        self._filter = text.upper()
-
     def paint(self, painter, option, index):
+        with this.profiler.phase('paint'):
+            self._paint(painter, option, index)
+
+    def _paint(self, painter, option, index):
         painter.save()
         style = option.widget.style()
         self.initStyleOption(option, index)
         painter.setClipRect(option.rect)
 
-        parm_tuple = index.data(ParmTupleRole)
         background = index.data(Qt.BackgroundRole)
+        selected = option.state & QStyle.State_Selected
 
-        if option.state & QStyle.State_Selected:
+        if selected:
             # Draw the background but nothing else
             option.text = ""; option.icon = QtGui.QIcon()
             style.drawControl(QtWidgets.QStyle.CE_ItemViewItem, option, painter, option.widget)
-            text_rect = style.subElementRect(QtWidgets.QStyle.SE_ItemViewItemText, option, option.widget)
         elif background:
             painter.fillRect(option.rect, background)
 
-        painter.translate(option.rect.topLeft())
-        field = InputField(self.parent(), index, self._filter, highlight=option.state & QStyle.State_Selected)
-        field.setGeometry(option.rect)
-        field.render(painter, QtCore.QPoint(0, 0), QtGui.QRegion(0, 0, option.rect.width(), option.rect.height()), QWidget.RenderFlag.DrawChildren)
+        # Draw what an InputField would look like, without building one; those are only made to edit a row
+        autocompletes   = index.data(AutoCompleteRole)
+        which_match     = index.data(WhichMatchRole)
+        alignment       = index.data(AlignmentRole)
+        whats_this      = index.data(Qt.WhatsThisRole)
+        icon            = index.data(IconRole)
+        values          = index.data(ValueRole)
+        text_color      = option.palette.color(QtGui.QPalette.Text)
+        rect = option.rect.adjusted(InputField.margin, 0, -InputField.margin, 0)
+        x = rect.left()
+
+        pixmap = this.pixmaps.get(icon, hou.ui.scaledSize(InputField.icon_size))
+        if pixmap:
+            width, height = (int(extent / pixmap.devicePixelRatio()) for extent in (pixmap.width(), pixmap.height()))
+            painter.drawPixmap(x, rect.center().y() - height // 2, pixmap)
+            x += width + ItemDelegate.spacing
+
+        painter.setPen(text_color)
+        label = InputField.format(autocompletes[0], alignment if which_match == 0 else None)
+        self._draw_text(painter, label, option.font, QtCore.QRect(x, rect.top(), InputField.label_width, rect.height()))
+        x += InputField.label_width + ItemDelegate.spacing
+
+        if whats_this:
+            self._draw_text(painter, whats_this, option.font, QtCore.QRect(x, rect.top(), rect.right() - x, rect.height()))
+        elif values:
+            # the parm tuple itself is HOM; everything painted comes from the record's values
+            sublabel_font = QtGui.QFont(option.font)
+            sublabel_font.setItalic(True); sublabel_font.setPixelSize(9)
+            n = len(values)
+            width = (rect.right() - x - ItemDelegate.spacing * (n - 1)) // n
+            for i in range(n):
+                box = QtCore.QRect(x, rect.top() + InputField.margin, width, ItemDelegate.field_height)
+                painter.fillRect(box, self._field_background)
+                border = "yellow" if selected and which_match and i == which_match - 1 else "black"
+                painter.setPen(QtGui.QColor(border))
+                painter.drawRect(box.adjusted(0, 0, -1, -1))
+                painter.setPen(text_color)
+                painter.drawText(box.adjusted(3, 0, -3, 0), Qt.AlignLeft | Qt.AlignVCenter, values[i])
+
+                painter.setPen(QtGui.QColor("darkgray"))
+                sublabel = InputField.format(autocompletes[i+1], alignment if which_match == i + 1 else None)
+                self._draw_text(painter, sublabel, sublabel_font, QtCore.QRect(x, box.bottom() + 1, width, ItemDelegate.sublabel_height), centered=True)
+                x += width + ItemDelegate.spacing
 
         painter.restore()
 
+    def _draw_text(self, painter, html, font, rect, centered=False):
+        key = (html, font.key(), rect.width())
+        text = ItemDelegate._texts.get(key)
+        if text is None:
+            text = QtGui.QStaticText(html)
+            text.setTextFormat(Qt.RichText)
+            text.setTextWidth(rect.width())
+            text.prepare(QtGui.QTransform(), font)
+            ItemDelegate._texts[key] = text
+        size = text.size()
+        x = rect.left() + ((rect.width() - size.width()) / 2 if centered else 0)
+        y = rect.top() + (rect.height() - size.height()) / 2
+        painter.setFont(font)
+        painter.drawStaticText(QtCore.QPointF(x, max(rect.top(), y)), text)
+
     def createEditor(self, parent, option, index):
         which_match = index.data(WhichMatchRole)
-        editor = InputField(parent, index, self._filter, highlight=False)
+        editor = InputField(parent, index, highlight=False)
 
         # focus the best autocomplete match
         which_match = index.data(WhichMatchRole)
@@ -267,7 +435,7 @@ class ItemDelegate(QStyledItemDelegate):
             if clicked: editor.setFocusProxy(clicked)
 
         editor.editingFinished.connect(self.editingFinished)
-        editor.valueChanged.connect(self.valueChanged)
+        editor.valueChanged.connect(self._preview.write)
         self.windowClosed.connect(lambda _: editor.editingFinished.emit())
 
         return editor
@@ -278,24 +446,55 @@ class ItemDelegate(QStyledItemDelegate):
         editor.undo_context.__enter__()
         parm_tuple = index.data(ParmTupleRole)
         editor.original_value = parm_tuple.eval()
+        # Interactive edits only go to the first node; don't cook anything until they're written to the rest
+        editor.update_mode = hou.updateModeSetting() if editor.siblings else None
+        if editor.siblings: hou.setUpdateMode(hou.updateMode.Manual)
 
     def setModelData(self, editor, model, index):
         editor.undo_context.__exit__(None, None, None)
-        if editor.parm_tuple.eval() != editor.original_value:
-            editor.parm_tuple.set(editor.original_value)
-            ParmTupleModel.record(editor.parm_tuple)
-            with hou.undos.group("Parameter Change"):
-                for i, parm in enumerate(editor.parm_tuple):
-                    self.valueChanged(parm, editor.line_edits[i].text())
+        try:
+            values = editor.parm_tuple.eval()
+            if values != editor.original_value:
+                editor.parm_tuple.set(editor.original_value)
+                ParmTupleModel.record(editor.parm_tuple)
+                changed = [i for i, value in enumerate(values) if value != editor.original_value[i]]
+                cleared = [i for i in changed if editor.line_edits[i].text() == ""]
+                with hou.undos.group("Parameter Change"):
+                    for parm_tuple in [editor.parm_tuple] + editor.siblings:
+                        ItemDelegate._write(parm_tuple, values, changed)
+                        for i in cleared: parm_tuple[i].revertToDefaults()
+        finally:
+            self._resume_cooking(editor)
+
+    @staticmethod
+    def _write(parm_tuple, values, changed):
+        """ Write only the edited components; in one set if rewriting the others with their values changes nothing """
+        untouched = [parm for i, parm in enumerate(parm_tuple) if i not in changed]
+        if parm_tuple.parmTemplate().type() != parmTemplateType.String and \
+                all(not parm.keyframes() and parm.getReferencedParm() == parm for parm in untouched):
+            merged = list(parm_tuple.eval())
+            for i in changed: merged[i] = values[i]
+            parm_tuple.set(merged)
+        else:
+            for i in changed: parm_tuple[i].set(values[i])
     
     def _closeEditor(self, editor, edit_hint):
         self.windowClosed.disconnect()
         if edit_hint == QAbstractItemDelegate.EndEditHint.RevertModelCache:
+            self._preview.cancel()
             editor.parm_tuple.set(editor.original_value)
             editor.undo_context.__exit__(None, None, None)
+        self._resume_cooking(editor)
+
+    @staticmethod
+    def _resume_cooking(editor):
+        if getattr(editor, 'update_mode', None) is not None:
+            hou.setUpdateMode(editor.update_mode)
+            editor.update_mode = None
 
     def editingFinished(self):
         editor = self.sender()
+        self._preview.flush() # the exact last value, before it's committed
         self.commitData.emit(editor)
         self.closeEditor.emit(editor)
     
@@ -313,6 +512,44 @@ class ItemDelegate(QStyledItemDelegate):
         else:
             parm.revertToDefaults()
         
+class PreviewWriter(QtCore.QObject):
+    """
+    Live-preview parm writes while typing or scrubbing, coalesced so that each one may start a cook: the first
+    write goes straight through, later ones wait until `interval` after the previous write returned, and only
+    the latest value for each parm is written. So however long cooks take, the UI never queues up behind them.
+    """
+    try: rate = float(hou.getenv("HCOMMANDER_PREVIEW_HZ") or 30) # writes per second
+    except ValueError: rate = 30.0
+    if not rate > 0: rate = 30.0
+
+    def __init__(self, write, parent=None):
+        super(PreviewWriter, self).__init__(parent)
+        self._write = write
+        self._pending = OrderedDict() # parm -> latest value
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(int(1000 / PreviewWriter.rate))
+        self._timer.timeout.connect(self._tick)
+
+    def write(self, parm, value):
+        self._pending.pop(parm, None)
+        self._pending[parm] = value
+        if not self._timer.isActive(): self._tick()
+
+    def _tick(self):
+        if not self._pending: return
+        self.flush()
+        self._timer.start() # measured from the end of the write, so a slow cook just means fewer writes
+
+    def flush(self):
+        pending, self._pending = self._pending, OrderedDict()
+        for parm, value in pending.items():
+            self._write(parm, value)
+
+    def cancel(self):
+        self._pending = OrderedDict()
+        self._timer.stop()
+
 class ListView(QtWidgets.QListView):
     ctrlClicked = QtCore.Signal(QtCore.QModelIndex)
     clicked = QtCore.Signal(QtWidgets.QListView)
@@ -336,46 +573,46 @@ class ListView(QtWidgets.QListView):
 
 class InputField(QtWidgets.QWidget):
     label_width = 160
+    icon_size = 64
     margin = 10
     valueChanged = QtCore.Signal(hou.Parm, str)
     editingFinished = QtCore.Signal()
 
     @staticmethod
-    def format(text, filter):
-        if not filter: return text
+    def format(text, alignment):
+        if not alignment: return text
         result = ""
-        alignment = AutoCompleteModel.align(text.upper(), filter)
-        current = alignment.pop()
+        matched = set(i for i, _ in alignment)
         for i, char in enumerate(text):
-            if i == current[0]:
+            if i in matched:
                 result += "<b>{}</b>".format(char)
-                current = alignment.pop() if alignment else (None,None)
             else:
                 result += char
         return result
 
-    def __init__(self, parent, index, filter, highlight=False):
+    def __init__(self, parent, index, highlight=False):
         super(InputField, self).__init__(parent)
 
         autocompletes   = index.data(AutoCompleteRole)
         which_match     = index.data(WhichMatchRole)
+        alignment       = index.data(AlignmentRole)
         parm_tuple      = index.data(ParmTupleRole)
         whats_this      = index.data(Qt.WhatsThisRole)
         icon            = index.data(IconRole)
         self.parm_tuple = parm_tuple
+        self.siblings   = index.data(SiblingsRole) or []
 
         layout = QtWidgets.QHBoxLayout()
         layout.setContentsMargins(InputField.margin, 0, InputField.margin, 0)
         self.setLayout(layout)
 
-        if icon:
-            icon_size = hou.ui.scaledSize(64)
-            pixmap = icon.pixmap(QtCore.QSize(icon_size, icon_size))
+        pixmap = this.pixmaps.get(icon, hou.ui.scaledSize(InputField.icon_size))
+        if pixmap:
             label = QtWidgets.QLabel()
             label.setPixmap(pixmap)
             layout.addWidget(label)
 
-        label = QtWidgets.QLabel(InputField.format(autocompletes[0], filter if which_match == 0 else None))
+        label = QtWidgets.QLabel(InputField.format(autocompletes[0], alignment if which_match == 0 else None))
         label.setFixedWidth(InputField.label_width)
         layout.addWidget(label)
 
@@ -398,7 +635,7 @@ class InputField(QtWidgets.QWidget):
                 line_edit.textEdited.connect(self._update)
                 self.line_edits.append(line_edit)
                 edit_layout.addWidget(line_edit)
-                label = QtWidgets.QLabel(InputField.format(autocompletes[i+1], filter if which_match == i + 1 else None))
+                label = QtWidgets.QLabel(InputField.format(autocompletes[i+1], alignment if which_match == i + 1 else None))
                 label.setStyleSheet("font: italic 9px; color: darkgray")
                 sizepolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
                 label.setSizePolicy(sizepolicy)
@@ -433,11 +670,12 @@ class InputField(QtWidgets.QWidget):
             #     return True
             elif self.parm_tuple.parmTemplate().namingScheme() == hou.parmNamingScheme.XYZW:
                 if event.key() in InputField._axis:
-                    l = len(self.parm_tuple)
-                    self.parm_tuple.set(InputField._axis[event.key()][0:l])
+                    # through valueChanged like any other edit, so it's ordered with the writes still pending
                     for i, parm in enumerate(self.parm_tuple):
+                        value = str(InputField._axis[event.key()][i])
+                        self.valueChanged.emit(parm, value)
                         textbox = self.line_edits[i]
-                        textbox.setText(str(parm.eval()))
+                        textbox.setText(value)
                         if InputField._axis[event.key()][i] == 1:
                             textbox.selectAll()
                             textbox.setFocus()
@@ -467,108 +705,422 @@ class InputField(QtWidgets.QWidget):
         parm = self.sender().property("parm")
         self.valueChanged.emit(parm, value)
 
-class AutoCompleteModel(QtCore.QSortFilterProxyModel):
+class LabelIndex(object):
+    """
+    The character bitsets of every label packed into one uint64 array, so that a query can be
+    prefiltered in a single vectorized pass rather than one row at a time; plus, for each label, the
+    sorted positions of each of its characters, so that matching jumps from occurrence to occurrence
+    with bisect rather than scanning the label.
+    """
+    def __init__(self, labelss):
+        self.labelss = [tuple(text.upper() for text in labels) for labels in labelss]
+        self._occurrences = []
+        bits = []; starts = [0]
+        for labels in self.labelss:
+            bits += [LabelIndex.bitset(text) for text in labels]
+            starts.append(len(bits))
+            self._occurrences.append(tuple(LabelIndex.positions(text) for text in labels))
+        self._bits = numpy.array(bits, dtype=numpy.uint64)
+        self._starts = starts
+        self._owners = numpy.repeat(numpy.arange(len(self.labelss)), numpy.diff(starts))
+
+    @staticmethod
+    def of(model):
+        return LabelIndex(model.index(i).data(AutoCompleteRole) for i in range(model.rowCount()))
+
+    @staticmethod
+    def concat(indexes):
+        """ Stack indexes end to end without re-indexing any labels """
+        result = LabelIndex(())
+        for index in indexes:
+            offset = len(result.labelss)
+            result._owners = numpy.concatenate((result._owners, index._owners + offset))
+            result._bits = numpy.concatenate((result._bits, index._bits))
+            result._starts += [start + result._starts[-1] for start in index._starts[1:]]
+            result.labelss += index.labelss
+            result._occurrences += index._occurrences
+        return result
+
+    @staticmethod
+    def bitset(text):
+        bitset = 0
+        for char in text:
+            o = ord(char)
+            if o < 48: continue
+            bitset |= 1 << (o - 48) % 64 # 0-9 ... A-Z map directly; anything past 'o' (incl. non-ascii) wraps around
+        return bitset
+
+    @staticmethod
+    def positions(text):
+        result = defaultdict(list)
+        for i, char in enumerate(text):
+            result[char].append(i)
+        return dict(result)
+
+    def bitsets(self, row):
+        return self._bits[self._starts[row]:self._starts[row+1]]
+
+    def candidates(self, bitset):
+        """ Rows with some label containing every character of the query, in any order """
+        selector = numpy.uint64(bitset)
+        mask = (self._bits & selector) == selector
+        return numpy.unique(self._owners[mask]).tolist()
+
+    def matches(self, row, text):
+        """ Make sure the characters are in order in any label """
+        return any(self.matches_label(row, which, text) for which in range(len(self._occurrences[row])))
+
+    def matches_label(self, row, which, text):
+        """ Make sure the characters are in order in label `which` """
+        occurrences = self._occurrences[row][which]
+        pos = -1
+        for char in text:
+            positions = occurrences.get(char, ())
+            i = bisect.bisect_right(positions, pos)
+            if i == len(positions): return False
+            pos = positions[i]
+        return True
+
+    def bound(self, row, text):
+        """
+        An upper bound of the best score `align` can give any label of `row` that matches, without aligning:
+        each character scores as if it continued a run at its best word start. None if no label matches.
+        """
+        best = None
+        for which, occurrences in enumerate(self._occurrences[row]):
+            if not self.matches_label(row, which, text): continue
+            label = self.labelss[row][which]
+            score = -1
+            for char in text:
+                positions = occurrences[char]
+                if positions[0] == 0:                             score += 5
+                elif any(label[p-1] == ' ' for p in positions): score += 4
+                else:                                             score += 2
+            if score > best: best = score
+        return best
+
+    def align(self, row, which, selector):
+        """
+        Same result as AutoCompleteModel.align for label `which` of `row`, but only the cells where the
+        text and selector characters are equal are visited, since every other cell of the table is unset.
+        """
+        text = self.labelss[row][which]; occurrences = self._occurrences[row][which]
+        m = len(text); n = len(selector)
+        table = [{}]; prevcols = []
+        for j in range(1, n+1):
+            previous = table[j-1]; current = {}
+            cols = [p+1 for p in occurrences.get(selector[j-1], ())]
+            prevmax = -1; iprevmax = 0; t = 0
+            for i in cols:
+                # running max of the previous row up to and including column i-1
+                while t < len(prevcols) and prevcols[t] <= i-1:
+                    if previous[prevcols[t]][1] > prevmax: prevmax = previous[prevcols[t]][1]; iprevmax = prevcols[t]
+                    t += 1
+                k, prev = previous.get(i-1, (-1,-1))
+                if   i == 1:              incr = 3
+                elif text[i-2] == ' ':    incr = 2
+                else:                     incr = 0
+                contig = 2 if k == i-2 else 1
+                current[i] = (i-1, prev+incr+contig) if prev+incr+contig > prevmax+incr else (iprevmax, prevmax+incr)
+            table.append(current); prevcols = cols
+
+        prev = 0; max = -1; pos = -1
+        for i in prevcols:
+            prev_, score = table[n][i]
+            if score > max:
+                max = score
+                prev = prev_
+                pos = i
+
+        result = [(pos-1, max)]
+        for i in range(n-1, 0, -1):
+            pos = prev
+            prev, max = table[i].get(prev % (m+1), (-1,-1)) # % mirrors the dense table's [-1] indexing
+            result.append((pos-1, max))
+        return result
+
+class Query(object):
+    """ The rows matching a query and their scores. Built on a worker thread, then published as a whole. """
+    def __init__(self, text, bitset):
+        self.text = text
+        self.bitset = bitset
+        self.rows = None
+        self.bounds = {}
+        self.scores = {}
+
+    def score(self, index, row):
+        """ (best score, which label matches, its alignment) for a row, aligned once per query and shared by sort and paint """
+        if row in self.scores: return self.scores[row]
+        best = exact = None
+        for i, text in enumerate(index.labelss[row]):
+            # a label missing some of the query can still align a partial, bogus path; only matching labels compete
+            if not index.matches_label(row, i, self.text): continue
+            alignment = index.align(row, i, self.text)
+            if best is None or alignment[0][1] > best[1][0][1]: best = (i, alignment)
+            if exact is None and text == self.text: exact = (i, alignment)
+        # exact matches win, otherwise the best aligned label
+        which, alignment = exact or best
+        self.scores[row] = (best[1][0][1], which, alignment)
+        return self.scores[row]
+
+class AutoCompleteModel(QtCore.QAbstractProxyModel):
+    """
+    Filters and ranks the rows of the source model for the current query. Matches go on a heap keyed by
+    a cheap upper bound of their score (LabelIndex.bound) and are only aligned once they reach the top;
+    only the best `batch` rows are popped, the rest a batch at a time as the view scrolls (fetchMore),
+    so typing costs what's visible rather than the whole catalog.
+
+    Ranking happens on a worker thread, `debounce` ms after the last keystroke. Each keystroke bumps a
+    generation number, which cancels any job still working on an older query; only the newest result
+    is applied (on the UI thread), after which `filtered` is emitted.
+    """
+    batch = 16
+    debounce = 15
+    filtered = Signal()
+    _ranked_signal = Signal(int, object, object)
+
     def __init__(self, parent=None):
         super(AutoCompleteModel, self).__init__(parent)
-        self._filter = None
+        self._query = None
+        self._queries = {}
+        self._pending = None
+        self._generation = 0
+        self._heap = []
+        self._ranked = []
+        self._positions = {}
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(AutoCompleteModel.debounce)
+        self._timer.timeout.connect(self._start)
+        self._ranked_signal.connect(self._publish)
 
     def setSourceModel(self, model):
-        QtCore.QSortFilterProxyModel.setSourceModel(self, model)
-        i = 0
-        self._bitsetss = []
-        # Construct a bitset for each word for fast(ish) fuzzy-matching
-        while i < model.rowCount():
-            labels = model.index(i).data(AutoCompleteRole)
-            bitsets = []
-            for text in labels:
-                bitset = 0
-                for char in text.upper():
-                    o = ord(char)
-                    if o < 48: continue
-                    bitset |= 1 << o - 48 # inlude 0-9 ... A-Z
-                bitsets.append(bitset)
-            self._bitsetss.append(tuple(bitsets))
-            i += 1
-
-    def filterAcceptsRow(self, sourceRow, sourceParent):
-        if not self._filter: return True
-        selector_bitset, selector_text = self._filter
-        if selector_bitset == 0: return True
-
-        labels = self.sourceModel().index(sourceRow, 0, sourceParent).data(AutoCompleteRole)
-        bitsets = self._bitsetss[sourceRow]
-
-        # check every character is present in any of the labels or names ...
-        match = False
-        for bitset in bitsets:
-            match = match or bitset & selector_bitset == selector_bitset
-        if not match:
-            return False
-        
-        # make sure the characters are in order in any text
-        for text in labels:
-            i = 0
-            for char in text.upper():
-                if char == selector_text[i]:
-                    i += 1
-                    if len(selector_text) == i: return True
-    
-        return False
+        self.beginResetModel()
+        QtCore.QAbstractProxyModel.setSourceModel(self, model)
+        model.dataChanged.connect(self._source_data_changed)
+        model.modelAboutToBeReset.connect(self.beginResetModel)
+        model.modelReset.connect(self._source_reset)
+        self._rebuild()
+        self.endResetModel()
 
-    def data(self, index, role):
-        if role == WhichMatchRole:
-            if not self._filter: return None
-            selector_bitset, selector_text = self._filter
+    def _source_reset(self):
+        self._rebuild()
+        self.endResetModel()
 
-            # first check for exact matches
-            autocompletes = index.data(AutoCompleteRole)
-            for i, text in enumerate(autocompletes):
-                if text.upper() == selector_text: return i
+    def _rebuild(self):
+        model = self.sourceModel()
+        self.cancel()
+        self._query = None
+        self._queries = {}
+        # Bitsets and character positions for each word for fast(ish) fuzzy-matching
+        self._index = model.label_index()
+        # A snapshot so that workers never call into the source model (and HOM)
+        self._sortkeys = model.sort_keys()
+        self._heap = [(key, 0, row, True) for row, key in enumerate(self._sortkeys)]
+        heapq.heapify(self._heap)
+        self._reset()
+
+    def index(self, row, column=0, parent=QtCore.QModelIndex()):
+        if parent.isValid() or column != 0 or not 0 <= row < len(self._ranked): return QtCore.QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=None):
+        return QtCore.QModelIndex()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._ranked)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 1
+
+    def mapToSource(self, index):
+        if not index.isValid(): return QtCore.QModelIndex()
+        return self.sourceModel().index(self._ranked[index.row()], 0)
+
+    def mapFromSource(self, index):
+        if not index or not index.isValid() or index.row() not in self._positions: return QtCore.QModelIndex()
+        return self.index(self._positions[index.row()], 0)
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return not parent.isValid() and len(self._heap) > 0
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        n = min(AutoCompleteModel.batch, len(self._heap))
+        if n == 0: return
+        self.beginInsertRows(QtCore.QModelIndex(), len(self._ranked), len(self._ranked) + n - 1)
+        self._take(n)
+        self.endInsertRows()
 
-            bitsets = self._bitsetss[self.mapToSource(index).row()]
+    def _source_data_changed(self, top_left, bottom_right, roles=[]):
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            if row in self._positions:
+                index = self.index(self._positions[row], 0)
+                self.dataChanged.emit(index, index, roles)
 
-            # check every character is present in any of the labels or names ...
-            for i, bitset in enumerate(bitsets):
-                if bitset & selector_bitset == selector_bitset:
-                    return i
-            return None
+    def data(self, index, role):
+        if role == WhichMatchRole:
+            if not self._query: return None
+            return self._query.score(self._index, self.mapToSource(index).row())[1]
+        elif role == AlignmentRole:
+            if not self._query: return None
+            return self._query.score(self._index, self.mapToSource(index).row())[2]
         else:
             return super(AutoCompleteModel, self).data(index, role)
 
     def filter(self, text):
-        selector_bitset = 0
         text = text.upper()
-        for char in text:
-            o = ord(char)
-            if o < 48: continue
-            selector_bitset |= 1 << o - 48
-
-        if selector_bitset == 0: return
-        self._filter = (selector_bitset, text)
-        self.beginResetModel()
-        self.endResetModel()
+        if LabelIndex.bitset(text) == 0: return
+        self._pending = text
+        self._generation += 1
+        self._timer.start()
+
+    def flush(self):
+        """ Apply the pending query right now, on this thread; e.g., the user hit enter before the worker finished """
+        if self._pending is None: return
+        self._timer.stop()
+        self._generation += 1
+        query = self._query_for(self._pending)
+        with this.profiler.phase('filter'):
+            heap = self._match(query, self._index, self._sortkeys, lambda: False)
+        self._publish(self._generation, query, heap)
+
+    def cancel(self):
+        self._timer.stop()
+        self._pending = None
+        self._generation += 1
+
+    def _start(self):
+        if self._pending is None: return
+        generation = self._generation
+        query = self._query_for(self._pending)
+        index, sortkeys = self._index, self._sortkeys
+        cancelled = lambda: generation != self._generation
+        def work():
+            try:
+                with this.profiler.phase('filter'):
+                    heap = self._match(query, index, sortkeys, cancelled)
+                if heap is not None and not cancelled():
+                    self._ranked_signal.emit(generation, query, heap)
+            except Exception:
+                if not cancelled(): traceback.print_exc()
+        worker = threading.Thread(target=work)
+        worker.daemon = True
+        worker.start()
+
+    def _query_for(self, text):
+        if text not in self._queries:
+            self._queries[text] = Query(text, LabelIndex.bitset(text))
+        return self._queries[text]
+
+    def _match(self, query, index, sortkeys, cancelled):
+        """ Runs on a worker: everything it touches is immutable or owned by the query. None if cancelled. """
+        if query.rows is None:
+            narrowed = self._narrowed(query.text)
+            bounds = {}
+            for row in index.candidates(query.bitset):
+                if cancelled(): return None
+                if narrowed is None or row in narrowed:
+                    bound = index.bound(row, query.text)
+                    if bound is not None: bounds[row] = bound
+            query.bounds = bounds
+            query.rows = frozenset(bounds)
+        heap = [(sortkeys[row], -bound, row, False) for row, bound in query.bounds.iteritems()]
+        heapq.heapify(heap)
+        return heap
+
+    def _publish(self, generation, query, heap):
+        if generation != self._generation: return # stale
+        self._pending = None
+        with this.profiler.phase('sort'):
+            previous, self._query = self._query, query
+            self._heap = heap
+            ranked = [self._pop(heap, query) for _ in range(min(AutoCompleteModel.batch, len(heap)))]
+            wanted = set(ranked)
+            kept = [row for row in self._ranked if row in wanted]
+            self._rerank(ranked)
+            # rows that stayed only need repainting if the query now highlights them differently
+            for row in kept:
+                if not previous or previous.score(self._index, row)[1:] != query.score(self._index, row)[1:]:
+                    index = self.index(self._positions[row], 0)
+                    self.dataChanged.emit(index, index, [WhichMatchRole, AlignmentRole])
+        this.profiler.note(results=len(query.rows))
+        self.filtered.emit()
+
+    def _rerank(self, ranked):
+        """ Turn the current ranking into `ranked` with removes, moves and inserts rather than a reset, so views
+            keep their persistent indexes and only relayout what moved """
+        wanted = set(ranked)
+        root = QtCore.QModelIndex()
+        end = len(self._ranked)
+        while end > 0: # remove runs of rows that are gone, bottom up
+            if self._ranked[end-1] in wanted: end -= 1; continue
+            start = end
+            while start > 0 and self._ranked[start-1] not in wanted: start -= 1
+            self.beginRemoveRows(root, start, end-1)
+            del self._ranked[start:end]
+            self._reindex()
+            self.endRemoveRows()
+            end = start
+        i = 0
+        while i < len(ranked): # everything above i is in place; move or insert what belongs at i
+            row = ranked[i]
+            if i < len(self._ranked) and self._ranked[i] == row:
+                i += 1
+            elif row in self._positions:
+                j = self._positions[row]
+                self.beginMoveRows(root, j, j, root, i)
+                self._ranked.insert(i, self._ranked.pop(j))
+                self._reindex()
+                self.endMoveRows()
+                i += 1
+            else:
+                run = i
+                while run < len(ranked) and ranked[run] not in self._positions: run += 1
+                self.beginInsertRows(root, i, run-1)
+                self._ranked[i:i] = ranked[i:run]
+                self._reindex()
+                self.endInsertRows()
+                i = run
+
+    def _reindex(self):
+        self._positions = dict((row, position) for position, row in enumerate(self._ranked))
+
+    def _reset(self):
+        """ Only order the first batch; heapify is linear, each pop log(n) """
+        self._ranked = []
+        self._positions = {}
+        self._take(AutoCompleteModel.batch)
+
+    def _take(self, n):
+        for _ in range(min(n, len(self._heap))):
+            row = self._pop(self._heap, self._query)
+            self._positions[row] = len(self._ranked)
+            self._ranked.append(row)
+
+    def _pop(self, heap, query):
+        """ The next row in rank order. A row that tops the heap on its bound is aligned and pushed back with
+            its real score, which the bound never undershoots, so rows come out exactly as if all were aligned. """
+        while True:
+            sortkey, score, row, aligned = heapq.heappop(heap)
+            if aligned: return row
+            heapq.heappush(heap, (sortkey, -query.score(self._index, row)[0], row, True))
+
+    def _narrowed(self, text):
+        """ Rows matching a query also match every prefix of it, so only rows accepted for the longest
+            prefix we've already seen need testing. Backspacing reuses the query's own rows. """
+        for i in range(len(text) - 1, 0, -1):
+            query = self._queries.get(text[:i])
+            if query and query.rows is not None:
+                return query.rows
+        return None
     
     def index_of(self, item):
+        self.flush()
         source_index = self.sourceModel().index_of(item)
+        # the item may not have been ranked yet
+        while source_index and source_index.row() not in self._positions and self.canFetchMore():
+            self.fetchMore()
         return self.mapFromSource(source_index)
-    
-    def lessThan(self, left, right):
-        lkey, rkey = left.data(SortKeyRole), right.data(SortKeyRole)
-        if lkey < rkey: return True
-        if rkey < lkey: return False
-
-        if not self._filter: return False
-        _, selector_text = self._filter
-
-        lautocompletes = left.data(AutoCompleteRole)
-        rautocompletes = right.data(AutoCompleteRole)
-
-        align = lambda x: AutoCompleteModel.align(x.upper(), selector_text)
-        lalignments, ralignments = map(align, lautocompletes), map(align, rautocompletes)
-        score = lambda x: x[0][1]
-        lmax, rmax = max(lalignments, key=score), max(ralignments, key=score)
-
-        return score(lmax) > score(rmax)
 
     @staticmethod
     def align(text, selector):
@@ -605,8 +1157,40 @@ class AutoCompleteModel(QtCore.QSortFilterProxyModel):
             result.append((pos-1, max))
         return result
 
+class ParmTupleRecord(object):
+    """ What the commander shows of a parm tuple, read from HOM once rather than on every sort and paint """
+    __slots__ = ('parm_tuple', 'siblings', 'labels', 'type', 'icon', 'at_default', 'recorded', 'values', 'time_dependent')
+
+    def __init__(self, parm_tuple, siblings=()):
+        template = parm_tuple.parmTemplate()
+        self.parm_tuple = parm_tuple
+        self.siblings = list(siblings) # the same parm tuple on the other selected nodes
+        self.labels = [template.label()] + [parm.name() for parm in parm_tuple]
+        self.type = template.type()
+        self.icon = ParmTupleModel.type2icon(self.type)
+        self.time_dependent = False
+        self.refresh()
+
+    def refresh(self):
+        self.at_default = self.parm_tuple.isAtDefault()
+        self.recorded = ParmTupleModel.isrecorded(self.parm_tuple)
+        self.values = None
+
+    def evaluate(self):
+        """ Values are only evaluated when a row is painted, and then kept until the parm or (if it's animated) the frame changes """
+        if self.values is None:
+            self.values = [str(parm.eval()) for parm in self.parm_tuple]
+            self.time_dependent = any(parm.isTimeDependent() for parm in self.parm_tuple)
+        return self.values
+
+    def sortkey(self):
+        if not self.at_default: return 0
+        if self.recorded: return 1
+        else: return 2
+
 class ParmTupleModel(QtCore.QAbstractListModel):
     history = set()
+    _default_background = None # built on first use: hou.qt isn't usable when this module is imported
 
     @staticmethod
     def type2icon(type):
@@ -616,7 +1200,7 @@ class ParmTupleModel(QtCore.QAbstractListModel):
         elif typename == "Int":    iconname = "DATATYPES_int"
         elif typename == "Toggle": iconname = "DATATYPES_boolean"
         elif typename == "String": iconname = "DATATYPES_string"
-        return hou.qt.Icon(iconname)
+        return iconname
     
     @staticmethod
     def _filter(parmTuples):
@@ -624,61 +1208,133 @@ class ParmTupleModel(QtCore.QAbstractListModel):
         parmTuples = [pt for pt in parmTuples if pt.parmTemplate().type() in valid_types and not pt.isHidden() and not pt.isDisabled()]
         return parmTuples
 
-    def __init__(self, parm_tuples, parent=None):
+    def __init__(self, parm_tuples, watch=False, siblings=(), parent=None):
         super(ParmTupleModel, self).__init__(parent)
+        if siblings:
+            shared = [(parm_tuple, [node.parmTuple(parm_tuple.name()) for node in siblings]) for parm_tuple in parm_tuples]
+            shared = [(parm_tuple, others) for parm_tuple, others in shared if None not in others]
+            parm_tuples = [parm_tuple for parm_tuple, _ in shared]
+            self._records = [ParmTupleRecord(parm_tuple, others) for parm_tuple, others in shared]
+        else:
+            self._records = [ParmTupleRecord(parm_tuple) for parm_tuple in parm_tuples]
         self.parm_tuples = parm_tuples
+        self._nodes = []
+        self._watching = False
+        if watch: self.watch()
+
+    def watch(self):
+        """ Keep the records fresh while the parms are edited, here or anywhere else in Houdini, and as time changes """
+        self.detach()
+        self._nodes = list(set(record.parm_tuple.node() for record in self._records))
+        for node in self._nodes:
+            node.addEventCallback((hou.nodeEventType.ParmTupleChanged,), self._parm_tuple_changed)
+        hou.playbar.addEventCallback(self._frame_changed)
+        self._watching = True
+
+    def detach(self):
+        for node in self._nodes:
+            try: node.removeEventCallback((hou.nodeEventType.ParmTupleChanged,), self._parm_tuple_changed)
+            except (hou.ObjectWasDeleted, hou.OperationFailed): pass
+        self._nodes = []
+        if self._watching:
+            try: hou.playbar.removeEventCallback(self._frame_changed)
+            except hou.OperationFailed: pass
+        self._watching = False
+
+    def _frame_changed(self, event_type, frame):
+        if event_type != hou.playbarEvent.FrameChanged: return
+        for row, record in enumerate(self._records):
+            if record.time_dependent:
+                record.values = None
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [ValueRole])
+
+    def refresh(self):
+        """ Snapshot the parm tuples again, e.g., after some were deleted along with their nodes """
+        self.beginResetModel()
+        self._records = [ParmTupleRecord(parm_tuple) for parm_tuple in self.parm_tuples]
+        self.endResetModel()
+
+    def _parm_tuple_changed(self, node, parm_tuple=None, **kwargs):
+        for row, record in enumerate(self._records):
+            if parm_tuple is None and record.parm_tuple.node() == node or record.parm_tuple == parm_tuple:
+                record.refresh()
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
 
     def rowCount(self, parentindex=None):
-        return len(self.parm_tuples)
+        return len(self._records)
     
     def flags(self, index):
         return Qt.ItemIsSelectable | Qt.ItemIsEditable | Qt.ItemIsEnabled
 
     def data(self, index, role):
         if not index.isValid(): return None
-        if not 0 <= index.row() < len(self.parm_tuples): return None
+        if not 0 <= index.row() < len(self._records): return None
 
-        parm_tuple = self.parm_tuples[index.row()]
-        type = parm_tuple.parmTemplate().type()
+        record = self._records[index.row()]
 
         if role == ParmTupleRole:
-            return parm_tuple 
+            return record.parm_tuple
         elif role == AutoCompleteRole:
-            return [parm_tuple.parmTemplate().label()] + map(lambda x: x.name(), parm_tuple)
+            return record.labels
         elif role == Qt.BackgroundRole:
-            if parm_tuple.isAtDefault():
-                return QtGui.QBrush(hou.qt.getColor("ListBG"))
+            if record.at_default:
+                if ParmTupleModel._default_background is None:
+                    ParmTupleModel._default_background = QtGui.QBrush(hou.qt.getColor("ListBG"))
+                return ParmTupleModel._default_background
         elif role == IconRole:
-            return ParmTupleModel.type2icon(parm_tuple.parmTemplate().type())
+            return record.icon
+        elif role == ValueRole:
+            return record.evaluate()
+        elif role == SiblingsRole:
+            return record.siblings
         elif role == CallbackRole:
             return self.callback
         elif role == SortKeyRole:
-            if not parm_tuple.isAtDefault(): return 0
-            if ParmTupleModel.isrecorded(parm_tuple): return 1
-            else: return 2
+            return record.sortkey()
 
         return None
     
     def append(self, parm_tuple):
-        self.beginInsertRows(QtCore.QModelIndex(), len(self.parm_tuples) - 1, len(self.parm_tuples))
+        if any(record.parm_tuple == parm_tuple for record in self._records): return
+        self.beginInsertRows(QtCore.QModelIndex(), len(self._records), len(self._records))
         self.parm_tuples.append(weakref.proxy(parm_tuple, self.remove))
+        self._records.append(ParmTupleRecord(parm_tuple))
         self.endInsertRows()
+        if self._watching and parm_tuple.node() not in self._nodes:
+            self._nodes.append(parm_tuple.node())
+            parm_tuple.node().addEventCallback((hou.nodeEventType.ParmTupleChanged,), self._parm_tuple_changed)
     
     def remove(self, parm_tuple):
-        i = self.parm_tuples.index(parm_tuple)
-        self.beginRemoveRows(QtCore.QModelIndex(), i, i+1)
+        i = next((i for i, record in enumerate(self._records) if record.parm_tuple == parm_tuple), None)
+        if i is None: return
+        self.beginRemoveRows(QtCore.QModelIndex(), i, i)
         self.parm_tuples.remove(parm_tuple)
+        del self._records[i]
         self.endRemoveRows()
 
     def index_of(self, item):
-        i = self.parm_tuples.index(item)
+        i = next(i for i, record in enumerate(self._records) if record.parm_tuple == item)
         return self.index(i, 0)
 
+    def label_index(self):
+        return LabelIndex.of(self)
+
+    def labels(self):
+        return [self.data(self.index(row), AutoCompleteRole) for row in range(self.rowCount())]
+
+    def sort_keys(self):
+        return [self.data(self.index(row), SortKeyRole) for row in range(self.rowCount())]
+
     def callback(self, index, hcommander, list):
         parm_tuple = index.data(ParmTupleRole)
         type = parm_tuple.parmTemplate().type()
         if type == parmTemplateType.Toggle:
-            parm_tuple.set([int(not parm_tuple.eval()[0])])
+            value = [int(not parm_tuple.eval()[0])]
+            with hou.undos.group("Parameter Change"):
+                for parm_tuple in [parm_tuple] + index.data(SiblingsRole):
+                    parm_tuple.set(value)
         else:
             list.edit(index)
 
@@ -714,29 +1370,362 @@ class ActionModel(QtCore.QAbstractListModel):
 
     def index_of(self, item):
         return None
+
+    def label_index(self):
+        return LabelIndex.of(self)
+
+    def labels(self):
+        return [self.data(self.index(row), AutoCompleteRole) for row in range(self.rowCount())]
+
+    def sort_keys(self):
+        return [self.data(self.index(row), SortKeyRole) for row in range(self.rowCount())]
     
     def callback(self, index, hcommander, list):
         action = index.data(ActionRole)
         with hou.undos.group("Invoke custom user function"):
-            try: exec(action.fn, {}, {'hou': hou})
-            except Exception as e:
-                print(e)
-                print(self.fn)
+            try: exec(action.code, {}, {'hou': hou})
+            except Exception:
+                print "Action '%s' (%s) failed:" % (action.label, action.location)
+                traceback.print_exc()
 
-class NodeTypeModel(QtCore.QAbstractListModel):
+class Profiler(QtCore.QObject):
+    """
+    Optional per-keystroke timings, turned on by setting HCOMMANDER_PROFILE. Each keystroke opens a record that
+    adds up the time spent in every phase, on any thread, until the next keystroke. The running record is shown
+    at the bottom of the window, and finished records are appended as JSON lines to a rotating log in the
+    preferences directory so slow cases can be collected from other machines.
+    """
+    enabled = bool(hou.getenv("HCOMMANDER_PROFILE"))
+    phases = ('filter', 'sort', 'paint', 'tooltips', 'icons')
+    logfile = os.path.join(hou.getenv('HOUDINI_USER_PREF_DIR'), "hcommander_profile.log")
+    logsize = 1024 * 1024 # bytes per file; three old files are kept
+
+    updated = Signal(str)
+    _added = Signal()
+
+    class Phase(object):
+        __slots__ = ('profiler', 'name', 'start')
+        def __init__(self, profiler, name):
+            self.profiler = profiler
+            self.name = name
+        def __enter__(self):
+            self.start = time.time()
+        def __exit__(self, *args):
+            self.profiler.add(self.name, time.time() - self.start)
+
+    class Off(object):
+        def __enter__(self): pass
+        def __exit__(self, *args): pass
+    off = Off()
+
+    def __init__(self, parent=None):
+        super(Profiler, self).__init__(parent)
+        self._record = None
+        self._lock = threading.Lock()
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._update)
+        self._added.connect(self._schedule) # coalesce updates from paints and other threads
+        self._log = logging.getLogger("hcommander.profile")
+        if Profiler.enabled and not self._log.handlers:
+            handler = logging.handlers.RotatingFileHandler(Profiler.logfile, maxBytes=Profiler.logsize, backupCount=3)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._log.addHandler(handler)
+            self._log.setLevel(logging.INFO)
+            self._log.propagate = False
+
+    def phase(self, name):
+        return Profiler.Phase(self, name) if Profiler.enabled and self._record else Profiler.off
+
+    def begin(self, text, **fields):
+        if not Profiler.enabled: return
+        self.end()
+        now = time.time()
+        record = dict(fields, text=text, time=now, start=now, last=now)
+        for phase in Profiler.phases:
+            record[phase + '_ms'] = 0.0
+            record[phase + '_count'] = 0
+        with self._lock:
+            self._record = record
+
+    def add(self, phase, seconds):
+        with self._lock:
+            record = self._record
+            if not record: return
+            record[phase + '_ms'] += seconds * 1000
+            record[phase + '_count'] += 1
+            record['last'] = time.time()
+        self._added.emit()
+
+    def note(self, **fields):
+        with self._lock:
+            if self._record: self._record.update(fields)
+
+    def end(self):
+        with self._lock:
+            record, self._record = self._record, None
+        if not record: return
+        record['total_ms'] = (record.pop('last') - record.pop('start')) * 1000
+        try: self._log.info(json.dumps(record, sort_keys=True))
+        except Exception: traceback.print_exc()
+
+    def _schedule(self):
+        self._timer.start()
+
+    def _update(self):
+        with self._lock:
+            record = dict(self._record) if self._record else None
+        if not record: return
+        self.updated.emit("%s: %s  (%d results)" % (record['text'], "  ".join(
+            "%s %.1fms/%d" % (phase, record[phase + '_ms'], record[phase + '_count']) for phase in Profiler.phases),
+            record.get('results', 0)))
+
+this.profiler = Profiler()
+
+class PixmapCache(QtCore.QObject):
+    """
+    Rasterized icons shared by every row of every window, keyed by icon name, size and device pixel
+    ratio, and bounded by memory. QPixmaps can only be made on the UI thread, so prewarming a category's
+    icons happens in short slices whenever the event loop is otherwise idle. Prewarming only fills free
+    space: it stops rather than evict anything, so it never pushes out the icons of the rows on screen.
+    """
+    capacity = 32 * 1024 * 1024 # bytes
+    slice = 0.005 # seconds
+
+    def __init__(self, parent=None):
+        super(PixmapCache, self).__init__(parent)
+        self._pixmaps = LRUCache(PixmapCache.capacity, cost=lambda pixmap: pixmap.width() * pixmap.height() * 4)
+        self._prewarm = deque()
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._prewarm_some)
+
+    @staticmethod
+    def key(name, size):
+        return (name, size, QtWidgets.QApplication.instance().devicePixelRatio())
+
+    def get(self, name, size):
+        if not name: return None
+        key = PixmapCache.key(name, size)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is None:
+            with this.profiler.phase('icons'):
+                try: pixmap = hou.qt.Icon(name).pixmap(QtCore.QSize(size, size))
+                except: pixmap = QtGui.QPixmap() # remember unknown icons too
+            self._pixmaps[key] = pixmap
+        return None if pixmap.isNull() else pixmap
+
+    def prewarm(self, names, size):
+        seen = set()
+        self._prewarm = deque()
+        for name in names:
+            if not name or name in seen or PixmapCache.key(name, size) in self._pixmaps: continue
+            seen.add(name)
+            self._prewarm.append((name, size))
+        self._timer.start()
+
+    def _prewarm_some(self):
+        deadline = time.time() + PixmapCache.slice
+        while self._prewarm and time.time() < deadline:
+            name, size = self._prewarm[0]
+            extent = size * QtWidgets.QApplication.instance().devicePixelRatio()
+            if self._pixmaps.total + extent * extent * 4 > PixmapCache.capacity:
+                self._prewarm.clear() # full: whatever is cached now was used more recently
+                break
+            self.get(*self._prewarm.popleft())
+        if not self._prewarm:
+            self._timer.stop()
+
+this.pixmaps = PixmapCache()
+
+class TooltipCache(QtCore.QObject):
+    """
+    Rendering a node type's help tooltip through the help server is slow, so tooltips are kept in a file
+    between sessions. Entries are keyed by node type and stamped with their HDA's modification time, so
+    changed HDAs are re-rendered on use; the whole file is discarded when the Houdini build changes.
+
+    Misses are never rendered on the caller's thread: they're queued for a background worker, most recent
+    request first, and `arrived` is emitted with the node type's key once the tooltip is in the cache.
+    Failures (e.g., the help server isn't up yet) are only remembered in memory, for `retry` seconds.
+    """
+    version = 1
+    capacity = 4096
+    backlog = 64
+    retry = 60
+    placeholder = "..."
     app = houdinihelp.server.get_houdini_app()
-    type2tooltip = {}
-    history = weakref.WeakSet()
+    _userdir = hou.getenv('HOUDINI_USER_PREF_DIR')
+    cachefile = os.path.join(_userdir, "hcommander_tooltips.json")
+
+    arrived = Signal(object)
+    _rendered = Signal(object, object, object)
+
+    def __init__(self, parent=None):
+        super(TooltipCache, self).__init__(parent)
+        self._build = hou.applicationVersionString()
+        self._entries = LRUCache(TooltipCache.capacity, self._load())
+        self._dirty = False
+        self._failed = {} # key -> (stamp, time of the failure)
+        self._requests = OrderedDict() # key -> (stamp, url), most recent last
+        self._inflight = None
+        self._lock = threading.Condition()
+        self._worker = None
+        self._rendered.connect(self._store)
+
+    def _load(self):
+        try:
+            with open(TooltipCache.cachefile) as f:
+                cache = json.load(f)
+        except (IOError, ValueError):
+            return ()
+        if cache.get("version") != TooltipCache.version or cache.get("build") != self._build:
+            return ()
+        return ((name, (stamp, tooltip)) for name, stamp, tooltip in cache["entries"])
+
+    def save(self):
+        if not self._dirty: return
+        cache = {
+            "version": TooltipCache.version,
+            "build": self._build,
+            "entries": [[name, stamp, tooltip] for name, (stamp, tooltip) in self._entries.items()],
+        }
+        try:
+            with open(TooltipCache.cachefile, "w") as f:
+                json.dump(cache, f)
+            self._dirty = False
+        except IOError:
+            traceback.print_exc()
+
+    @staticmethod
+    def stamp(node_type):
+        definition = node_type.definition()
+        return definition.modificationTime() if definition else 0
+
+    def get(self, record):
+        """ The cached tooltip for a NodeTypeRecord, or None after queueing it to be rendered in the background """
+        key, stamp = record.key, record.stamp
+        entry = self._entries.get(key)
+        if entry and entry[0] == stamp: return entry[1]
+        failed = self._failed.get(key)
+        if failed and failed[0] == stamp and time.time() - failed[1] < TooltipCache.retry: return ""
+
+        with self._lock:
+            if key != self._inflight:
+                self._requests.pop(key, None)
+                self._requests[key] = (stamp, record.help_url)
+                while len(self._requests) > TooltipCache.backlog:
+                    self._requests.popitem(last=False)
+                self._lock.notify()
+        if not self._worker:
+            self._worker = threading.Thread(target=self._work)
+            self._worker.daemon = True
+            self._worker.start()
+        return None
+
+    def _work(self):
+        while True:
+            with self._lock:
+                while not self._requests: self._lock.wait()
+                key, (stamp, url) = self._requests.popitem(last=True)
+                self._inflight = key
+            try:
+                with TooltipCache.app.app_context(), this.profiler.phase('tooltips'):
+                    tooltip = houdinihelp.api.getTooltip(houdinihelp.api.urlToPath(url))
+            except Exception:
+                traceback.print_exc()
+                tooltip = None
+            with self._lock:
+                self._inflight = None
+            self._rendered.emit(key, stamp, tooltip)
+
+    def _store(self, key, stamp, tooltip):
+        if tooltip is None:
+            self._failed[key] = (stamp, time.time())
+        else:
+            self._failed.pop(key, None)
+            self._entries[key] = (stamp, tooltip)
+            self._dirty = True
+        self.arrived.emit(key)
+
+class NodeTypeRecord(object):
+    __slots__ = ('node_type', 'name', 'key', 'description', 'icon', 'visible', 'stamp', 'help_url')
+
+    def __init__(self, node_type):
+        self.node_type = node_type
+        self.name = node_type.name()
+        self.key = node_type.nameWithCategory()
+        self.description = node_type.description()
+        self.icon = node_type.icon()
+        self.visible = not node_type.hidden() and not node_type.deprecated()
+        self.stamp = TooltipCache.stamp(node_type)
+        self.help_url = node_type.defaultHelpUrl()
+
+class NodeTypeCatalog(object):
+    """
+    Everything we need to know about the node types of a category, read from HOM once per process and shared by
+    every commander window, the tooltip prefetcher and the hotkey system. Catalogs are dropped when HDA
+    definitions are installed, uninstalled or saved, and when utility_ui hides operators.
+    """
+    _catalogs = {}
 
     @staticmethod
-    def filter(node_types):
-        visible = list(nt for nt in node_types.values()
-            if not nt.hidden() and not nt.deprecated())
-        return visible
+    def of(category):
+        catalog = NodeTypeCatalog._catalogs.get(category.name())
+        if not catalog:
+            catalog = NodeTypeCatalog._catalogs[category.name()] = NodeTypeCatalog(category)
+        return catalog
 
-    def __init__(self, node_types, parent=None):
+    @staticmethod
+    def invalidate(*args, **kwargs):
+        NodeTypeCatalog._catalogs.clear()
+
+    @staticmethod
+    def watch():
+        events = (hou.hdaEventType.AssetCreated, hou.hdaEventType.AssetDeleted, hou.hdaEventType.AssetSaved,
+            hou.hdaEventType.LibraryInstalled, hou.hdaEventType.LibraryUninstalled)
+        previous = getattr(hou.session, "_hcommander_hda_callback", None)
+        if previous:
+            try: hou.hda.removeEventCallback(events, previous)
+            except hou.OperationFailed: pass
+        hou.hda.addEventCallback(events, NodeTypeCatalog.invalidate)
+        hou.session._hcommander_hda_callback = NodeTypeCatalog.invalidate
+
+    def __init__(self, category):
+        self.records = [NodeTypeRecord(nt) for nt in category.nodeTypes().values()]
+        self.names = [record.name for record in self.records]
+        visible = self.visible = [record for record in self.records if record.visible]
+        self.node_types = [record.node_type for record in visible]
+        self.icons = [record.icon for record in visible]
+        self.rows = dict((record.key, row) for row, record in enumerate(visible))
+        self.labels = [[record.description] for record in visible]
+        # Bitsets and character positions of the descriptions, for fuzzy-matching
+        self.index = LabelIndex(self.labels)
+
+    def find(self, pattern):
+        names = fnmatch.filter(self.names, pattern)
+        return self.records[self.names.index(names[0])].node_type if names else None
+
+class NodeTypeModel(QtCore.QAbstractListModel):
+    tooltips = TooltipCache()
+    history = weakref.WeakSet()
+
+    def __init__(self, category, parent=None):
         super(NodeTypeModel, self).__init__(parent)
-        self._node_types = NodeTypeModel.filter(node_types)
+        catalog = self.catalog = NodeTypeCatalog.of(category)
+        self._records = catalog.visible
+        self._node_types, self._labels, self._index, self._rows, self._icons = \
+            catalog.node_types, catalog.labels, catalog.index, catalog.rows, catalog.icons
+        self._sortkeys = [0 if nt in NodeTypeModel.history else 1 for nt in self._node_types]
+        NodeTypeModel.tooltips.arrived.connect(self._tooltip_arrived)
+
+    def detach(self):
+        NodeTypeModel.tooltips.arrived.disconnect(self._tooltip_arrived)
+
+    def _tooltip_arrived(self, key):
+        if key not in self._rows: return
+        index = self.index(self._rows[key])
+        self.dataChanged.emit(index, index, [Qt.WhatsThisRole])
 
     def rowCount(self, parentindex=None):
         return len(self._node_types)
@@ -745,24 +1734,18 @@ class NodeTypeModel(QtCore.QAbstractListModel):
         node_type = self._node_types[index.row()]
     
         if role == AutoCompleteRole:
-            return [node_type.description()]
+            return self._labels[index.row()]
         elif role == Qt.WhatsThisRole:
-            if node_type in NodeTypeModel.type2tooltip: return NodeTypeModel.type2tooltip[node_type]
-            # FIXME load from a file since it's too slow!
-            with NodeTypeModel.app.app_context():
-                url = houdinihelp.api.urlToPath(node_type.defaultHelpUrl())
-                tooltip = houdinihelp.api.getTooltip(url)
-                NodeTypeModel.type2tooltip[node_type] = tooltip
-            return NodeTypeModel.type2tooltip[node_type]
+            tooltip = NodeTypeModel.tooltips.get(self._records[index.row()])
+            return TooltipCache.placeholder if tooltip is None else tooltip
         elif role == IconRole:
-            try: return hou.qt.Icon(node_type.icon())
-            except: pass
+            return self._icons[index.row()]
         elif role == CallbackRole:
             return self.callback
         elif role == NodeTypeRole:
             return node_type
         elif role == SortKeyRole:
-            return 0 if node_type in NodeTypeModel.history else 1
+            return self._sortkeys[index.row()]
 
         return None
 
@@ -772,6 +1755,18 @@ class NodeTypeModel(QtCore.QAbstractListModel):
     def index_of(self, item):
         return None
 
+    def label_index(self):
+        return self._index
+
+    def labels(self):
+        return self._labels
+
+    def icon_names(self):
+        return self._icons
+
+    def sort_keys(self):
+        return self._sortkeys
+
     def callback(self, index, hcommander, list):
         with hou.undos.group("Create Node"):
             node_type = index.data(NodeTypeRole)
@@ -802,44 +1797,78 @@ class NodeTypeModel(QtCore.QAbstractListModel):
             if hasattr(new_node, "setRenderFlag"): new_node.setRenderFlag(True)
 
             NodeTypeModel.history.add(node_type)
+            self._sortkeys[self._rows[node_type.nameWithCategory()]] = 0
             hcommander.close()
 
 class CompositeModel(QtCore.QAbstractListModel):
+    """
+    Rows of the submodels laid end to end. The columns the proxy and the delegates read most (labels, sort keys,
+    callbacks) are copied out of the submodels once, when they are set; other roles are forwarded to the
+    submodel that owns the row, found through the kind column and the offsets table.
+    """
     def __init__(self, models, parent=None):
         super(CompositeModel, self).__init__(parent)
+        self._models = []
+        self._slots = []
+        self.set_models(models)
+
+    def set_models(self, models):
+        self.beginResetModel()
+        for model, slot in self._slots:
+            model.dataChanged.disconnect(slot)
         self._models = models
+        self._slots = []
+        self._offsets = [0]
+        self._kinds, self._labels, self._sortkeys, self._callbacks = [], [], [], []
+        for kind, model in enumerate(models):
+            count = model.rowCount()
+            self._offsets.append(self._offsets[-1] + count)
+            self._kinds += [kind] * count
+            self._labels += model.labels()
+            self._sortkeys += model.sort_keys()
+            self._callbacks += [model.callback] * count
+            slot = lambda top_left, bottom_right, roles=[], kind=kind: self._data_changed(kind, top_left, bottom_right, roles)
+            model.dataChanged.connect(slot)
+            self._slots.append((model, slot))
+        self.endResetModel()
+
+    def _data_changed(self, kind, top_left, bottom_right, roles):
+        offset = self._offsets[kind]
+        # in place: the proxy ranks from this very list, so an edited parm moves group on the next query
+        model = self._models[kind]
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            self._sortkeys[offset + row] = model.data(model.index(row), SortKeyRole)
+        self.dataChanged.emit(self.index(offset + top_left.row()), self.index(offset + bottom_right.row()), roles)
         
     def rowCount(self, parentindex=None):
-        sum = 0
-        for model in self._models:
-            sum += model.rowCount(parentindex)
-        return sum
+        return len(self._kinds)
     
     def data(self, index, role):
-        index = self.map_to_source(index)
-        return index.data(role)
+        row = index.row()
+        if   role == AutoCompleteRole: return self._labels[row]
+        elif role == SortKeyRole:      return self._sortkeys[row]
+        elif role == CallbackRole:     return self._callbacks[row]
+        return self.map_to_source(index).data(role)
     
     def flags(self, index):
         return self.map_to_source(index).flags()
     
     def index_of(self, item):
-        offset = 0
-        for model in self._models:
+        for kind, model in enumerate(self._models):
             index = model.index_of(item)
-            if index: return self.index(index.row(), 0)
-            offset += model.rowCount()
+            if index: return self.index(self._offsets[kind] + index.row(), 0)
         return None
+
+    def label_index(self):
+        return LabelIndex.concat([model.label_index() for model in self._models])
+
+    def sort_keys(self):
+        return self._sortkeys
     
     def map_to_source(self, index):
         row = index.row()
-        model = None
-        for model_ in self._models:
-            if row < model_.rowCount():
-                model = model_
-                break
-            row -= model_.rowCount()
-        index = model.index(row)
-        return index
+        kind = self._kinds[row]
+        return self._models[kind].index(row - self._offsets[kind])
 
 """
 ACTIONS are loaded from a CSV config file. Actions can apply EITHER to selected objects,
@@ -853,41 +1882,130 @@ class Action(object):
     _userdir = hou.getenv('HOUDINI_USER_PREF_DIR')
     configfile = os.path.join(_userdir, "hcommander.csv")
 
-    _actions = None
+    _actions = {} # class -> [(Selector, Action)], in file order
+    _resolved = {} # (class, node type) -> [(Selector, Action)] that may apply to such nodes
     @staticmethod
     def load():
-        print "Reloading hcommander actions..."
-        Action._actions = defaultdict(lambda: defaultdict(list))
-        with open(Action.configfile) as f:
+        Action.reloader.load()
+
+    @staticmethod
+    def apply(rows):
+        actions = defaultdict(list)
+        classes = {}
+        for klass, selection, icon, label, name, description, fn, code, location in rows:
+            try: selector = Selector.of(selection)
+            except SyntaxError as e:
+                print "%s: action '%s' has a bad selector, skipping it: %s" % (location, label, e.msg)
+                continue
+            if klass not in classes: classes[klass] = eval(klass, {'hou': hou})
+            action = Action(icon, label, name, description, fn, code, location)
+            actions[classes[klass]].append((selector, action))
+        Action._actions, Action._resolved = dict(actions), {}
+
+    @staticmethod
+    def compile_file(path):
+        """ The actions as tuples of strings and code objects, keeping Class as an expression, plus syntax errors """
+        rows = []; errors = []
+        with open(path) as f:
             reader = csv.DictReader(f)
+            reader.fieldnames # read the header
+            line = reader.line_num + 1
             for row in reader:
-                klass = eval(row["Class"], {'hou': hou})
-                action = Action(row["Icon"], row["Label"], row["Name"], row["Description"], row["fn"])
-                Action._actions[klass][row["Selection"]].append(action)
+                location = "%s:%d" % (os.path.basename(path), line)
+                line = reader.line_num + 1 # rows can span lines
+                try:
+                    code = compile(row["fn"], location, 'exec')
+                except SyntaxError as e:
+                    errors.append("%s: action '%s' has a syntax error, skipping it: %s" % (location, row["Label"], e.msg))
+                    continue
+                rows.append((row["Class"], row["Selection"], row["Icon"], row["Label"], row["Name"], row["Description"], row["fn"], code, location))
+        return rows, errors
 
     @staticmethod
     def find(obj):
-        selector = obj.type().name()
-        ancestors = inspect.getmro(obj.__class__)
-        result = []
-        for ancestor in ancestors:
-            if not ancestor in Action._actions: continue
-            actions_for_class = Action._actions[ancestor]
-            result += actions_for_class[""]
-            result += actions_for_class[selector]
-        return result
-
-    def __init__(self, icon, label, name, description, fn):
-        self.icon = hou.qt.Icon(icon) if icon else None
+        key = (obj.__class__, obj.type().nameWithCategory())
+        resolved = Action._resolved.get(key)
+        if resolved is None:
+            # everything that can be decided from the node's class and type is decided once
+            resolved = Action._resolved[key] = [(selector, action)
+                for ancestor in inspect.getmro(obj.__class__)
+                for selector, action in Action._actions.get(ancestor, ())
+                if selector.code or selector.matches_type(obj.type())]
+        return [action for selector, action in resolved if not selector.code or selector.matches(obj)]
+
+    def __init__(self, icon, label, name, description, fn, code=None, location=None):
+        self.icon = icon or None
         self.label = label
         self.name = name
         self.description = description
         self.fn = fn
+        self.code = code or compile(fn, location or label, 'exec')
+        self.location = location
 
-Action.load()
+class Selector(object):
+    """
+    The Selection column of hcommander.csv says which nodes an action applies to:
+
+        (empty)                          every node
+        grouprange, group*               nodes whose type name matches the glob
+        * < groupcreate                  ...and that derive from a type matching the second glob, i.e., whatever their
+                                         namespace and version (e.g. "me::groupcreate::2.0"), are at heart a groupcreate
+        matchesSelector(obj, "grouprange")
+                                         anything else is a Python expression of `obj`, the node; it can use other
+                                         selectors through matchesSelector. An expression that could pass for a glob
+                                         (obj.isBypassed, obj < x) is rejected as ambiguous: parenthesize it
+
+    Selectors are compiled once per config load. Globs only depend on the node type, so Action.find decides them once
+    per type; expressions are evaluated every time.
+    """
+    _compiled = {}
+    _simple = re.compile(r"^\s*([^\s<()'\"]+)\s*(?:<\s*([^\s<()'\"]+)\s*)?$")
+    _names = frozenset(('obj', 'hou', 'matchesSelector', 'True', 'False', 'None'))
+
+    @staticmethod
+    def of(text):
+        if text not in Selector._compiled:
+            Selector._compiled[text] = Selector(text)
+        return Selector._compiled[text]
+
+    def __init__(self, text):
+        self.text = text
+        self.glob = self.base = self.code = None
+        simple = Selector._simple.match(text)
+        if simple:
+            if Selector._names.intersection(Selector._identifiers(text)):
+                raise SyntaxError("'%s' reads as an expression but would be matched as a glob; parenthesize it" % text.strip())
+            self.glob, self.base = simple.groups()
+        elif text.strip():
+            self.code = compile(text.strip(), "<selector %s>" % text.strip(), 'eval')
 
-__fs_watcher = QtCore.QFileSystemWatcher()
-__fs_watcher.addPath(Action.configfile)
-__fs_watcher.fileChanged.connect(Action.load)
+    @staticmethod
+    def _identifiers(text):
+        """ The names a glob-like selector would use if it were Python, or none if it isn't """
+        try: return compile(text.strip(), "<selector>", 'eval').co_names
+        except SyntaxError: return ()
+
+    def matches_type(self, node_type):
+        if self.glob is None: return True
+        if not fnmatch.fnmatchcase(node_type.name(), self.glob): return False
+        return self.base is None or fnmatch.fnmatchcase(node_type.nameComponents()[2], self.base)
+
+    def matches(self, obj):
+        if not self.code: return self.matches_type(obj.type())
+        try: return bool(eval(self.code, {'hou': hou, 'matchesSelector': matchesSelector}, {'obj': obj}))
+        except Exception:
+            print "Selector %s failed:" % self.text
+            traceback.print_exc()
+            return False
+
+def matchesSelector(obj, selector):
+    return Selector.of(selector).matches(obj)
+
+Action.reloader = utility_ui.ConfigReloader(Action.configfile,
+    parse=lambda path: utility_ui.load_compiled(path, Action.compile_file),
+    apply=Action.apply,
+    describe=lambda row: "%s [%s] %s (%s)" % (row[0], row[1], row[3], row[4]))
+Action.load()
+NodeTypeCatalog.watch()
 
 hou.session._hcommander_saved = ParmTupleModel(utility_ui.WeakParmTupleList())
\ No newline at end of file
@@ -14,22 +14,67 @@ this = sys.modules[__name__]
 __userdir = hou.getenv('HOUDINI_USER_PREF_DIR')
 __hotkeysfile = os.path.join(__userdir, "hotkeys.csv")
 
-__actions = None
-def __load_actions():
-    print "Reloading hotkeys..."
-    global __actions
-    __actions = defaultdict(lambda: defaultdict(list))
-    with open(__hotkeysfile) as f:
+class HotkeyAction(object):
+    """ A hotkey's action string ("op:name", "fn:code" or "mn:menu items") parsed and compiled once """
+    __slots__ = ('kind', 'source', 'code')
+
+    def __init__(self, kind, source, code):
+        self.kind = kind
+        self.source = source
+        self.code = code
+
+    @staticmethod
+    def parse(action, location="<action>"):
+        kind, source, code = action[:3], action[3:], None
+        if kind == 'fn:': code = compile(source, location, 'exec')
+        elif kind == 'mn:': code = compile(source, location, 'eval')
+        return HotkeyAction(kind, source, code)
+
+def compile_selector(selector):
+    """ A predicate on the selected nodes, which are fetched once per key event """
+    if selector == "":  return lambda selection: True
+    if selector == '+': return lambda selection: len(selection) > 0
+    return lambda selection: len(selection) > 0 and selection[0].type().name() == selector
+
+__contexts = ("OBJECT", "SOP", "VOP", "DOP", "COP", "CHOP", "SHOP", "ROP", "TOP", "LOP")
+def compile_hotkeys(path):
+    """ hotkeys.csv as (context, key, selector, kind, source, code) tuples plus syntax errors; see utility_ui.load_compiled """
+    entries = []; errors = []
+    with open(path) as f:
         reader = csv.DictReader(f)
+        reader.fieldnames # read the header
+        line = reader.line_num + 1
         for row in reader:
-            for context in ("OBJECT", "SOP", "VOP", "DOP", "COP", "CHOP", "SHOP", "ROP", "TOP", "LOP"):
+            location = "%s:%d" % (os.path.basename(path), line)
+            line = reader.line_num + 1 # rows can span lines
+            for context in __contexts:
                 if row[context] != '':
-                    __actions[context][row["Key Name"]].append((row["Selection"], row[context]))
-__load_actions()
-
-this.fs_watcher = QtCore.QFileSystemWatcher()
-this.fs_watcher.addPath(__hotkeysfile)
-this.fs_watcher.fileChanged.connect(__load_actions)
+                    try: action = HotkeyAction.parse(row[context], location)
+                    except SyntaxError as e:
+                        errors.append("%s: %s action for %s has a syntax error, skipping it: %s" % (location, context, row["Key Name"], e.msg))
+                        continue
+                    entries.append((context, row["Key Name"], row["Selection"], action.kind, action.source, action.code))
+    return entries, errors
+
+__dispatch = defaultdict(list) # (context, key) -> [(selector, predicate, HotkeyAction)], in file order
+def __apply_hotkeys(entries):
+    global __dispatch
+    dispatch = defaultdict(list)
+    predicates = {}
+    for context, key, selector, kind, source, code in entries:
+        if selector not in predicates: predicates[selector] = compile_selector(selector)
+        dispatch[(context, key)].append((selector, predicates[selector], HotkeyAction(kind, source, code)))
+    __dispatch = dispatch
+
+def __describe_hotkey(entry):
+    context, key, selector, kind, source, code = entry
+    return "%s %s%s: %s" % (context, key, " [%s]" % selector if selector else "", (kind + source)[:60])
+
+this.hotkeys = utility_ui.ConfigReloader(__hotkeysfile,
+    parse=lambda path: utility_ui.load_compiled(path, compile_hotkeys),
+    apply=__apply_hotkeys,
+    describe=__describe_hotkey)
+this.hotkeys.load()
 
 
 def invoke_action_from_key(uievent):
@@ -42,54 +87,53 @@ def invoke_action_from_key(uievent):
 
     context = editor.pwd().childTypeCategory().name()
     csv_context = context.upper()
-    if csv_context in __actions and uievent.key in __actions[csv_context]:
-        selectors = __actions[csv_context][uievent.key]
-        if selectors:
-            for selector in selectors:
-                if selector_matches(selector[0]):
-                    return None, execute_action_string(uievent, selector[1])
+    entries = __dispatch.get((csv_context, uievent.key))
+    if entries:
+        selection = hou.selectedNodes() if any(selector for selector, _, _ in entries) else ()
+        for _, predicate, action in entries:
+            if predicate(selection):
+                return None, execute_action(uievent, action)
 
     return None, False
 
 
 def selector_matches(selector):
-    if selector == "":
-        return True
-
-    selected_nodes = hou.selectedNodes()
-    if len(selected_nodes) == 0:
-        return False
-        
-    if selector == '+':
-        return True
-
-    return selected_nodes[0].type().name() == selector
+    return compile_selector(selector)(hou.selectedNodes() if selector else ())
 
+__parsed = {} # action strings from menus -> HotkeyAction
 def execute_action_string(uievent, action):
+    if action not in __parsed:
+        try: __parsed[action] = HotkeyAction.parse(action)
+        except SyntaxError:
+            traceback.print_exc()
+            print(action)
+            return False
+    return execute_action(uievent, __parsed[action])
+
+def execute_action(uievent, action):
     editor = uievent.editor
-    opfunc = action[3:]
 
-    if action.startswith('op:'):
+    if action.kind == 'op:':
         with hou.undos.group("Create new node"):
-            createNewNode(editor, opfunc)
+            createNewNode(editor, action.source)
             return True
-    elif action.startswith('fn:'):
+    elif action.kind == 'fn:':
         try:
             with hou.undos.group("Invoke custom user function"):
-                exec(opfunc, None, {'uievent': uievent, 'hou': hou})
+                exec(action.code, globals(), {'uievent': uievent, 'hou': hou})
             return True
         except Exception as e:
             traceback.print_exc()
-            print(opfunc)
-    elif action.startswith('mn:'):
+            print(action.source)
+    elif action.kind == 'mn:':
         menu = MenuProvider()
         try:
-            menu.menuitems = eval(opfunc, {}, {'uievent': uievent, 'hou': hou, })
+            menu.menuitems = eval(action.code, {}, {'uievent': uievent, 'hou': hou, })
             get_popup_menu_result(menu, uievent)
             return True
         except Exception as e:
             traceback.print_exc()
-            print(opfunc)
+            print(action.source)
 
     return False
 
@@ -148,7 +192,7 @@ def build_menu(menu, title, menuitems):
             build_menu(submenu, None, item[1])
 
 def findNodeByType(context, pattern):
-    import fnmatch
+    import hcommander
 
     nodeTypeCategories = {}
     nodeTypeCategories['Object'] = hou.objNodeTypeCategory()
@@ -164,14 +208,7 @@ def findNodeByType(context, pattern):
 
     category = nodeTypeCategories[context]
 
-    nodes = [nodetype
-        for nodetypename, nodetype in category.nodeTypes().items()
-        if fnmatch.fnmatch(nodetypename, pattern)]
-
-    if nodes:
-        return nodes[0]
-    else:
-        return None
+    return hcommander.NodeTypeCatalog.of(category).find(pattern)
 
 
 def createNewNode(editor, nodetypename, parms=None):
@@ -3,6 +3,11 @@ import hdefereval
 import types
 import os
 import math
+import imp
+import marshal
+import hashlib
+import threading
+import traceback
 import ctypes
 import shiboken2
 from PySide2 import QtCore, QtWidgets, QtGui
@@ -25,6 +30,12 @@ class WeakParmTupleList(object):
             self._uniq.add(path)
             self._underlying.append(path)
 
+    def remove(self, parm_tuple):
+        path = WeakParmTupleList.parm_tuple_path(parm_tuple)
+        if path in self._uniq:
+            self._uniq.remove(path)
+            self._underlying.remove(path)
+
     def items(self):
         result = list()
         underlying = []
@@ -51,6 +62,119 @@ class WeakParmTupleList(object):
         return parm_tuple.node().path() + "/" + parm_tuple.name()
 
 
+compiled_version = 1
+def load_compiled(path, compile_file):
+    """
+    compile_file(path), cached in a marshal file next to `path`. The cache is used while the file's modification time
+    and size are unchanged, or failing that while its content hash is, so startup and reloads read one file rather
+    than parsing. Whatever compile_file returns must be marshallable: tuples, lists, strings and code objects.
+    """
+    cachefile = path + ".cache"
+    stat = os.stat(path)
+    version = (compiled_version, imp.get_magic())
+    stamp = (version, stat.st_mtime, stat.st_size)
+    try:
+        with open(cachefile, 'rb') as f:
+            cached_stamp, cached_digest, data = marshal.load(f)
+        if cached_stamp == stamp: return data
+    except Exception:
+        cached_stamp, cached_digest, data = None, None, None
+
+    with open(path, 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    if not (cached_stamp and cached_stamp[0] == version and cached_digest == digest):
+        data = compile_file(path)
+    try:
+        with open(cachefile + ".tmp", 'wb') as f:
+            marshal.dump((stamp, digest, data), f)
+        if os.path.exists(cachefile): os.remove(cachefile)
+        os.rename(cachefile + ".tmp", cachefile)
+    except (IOError, OSError) as e:
+        print "Couldn't cache %s: %s" % (path, e)
+    return data
+
+
+class ConfigReloader(QtCore.QObject):
+    """
+    Keeps a table built from a config file current. Bursts of change notifications are debounced, and the watch is
+    put back when an editor saves by replacing the file (the watcher silently drops it). The file is parsed on a
+    worker thread, `parse(path)` returning (entries, errors) where entries are hashable; then, on the UI thread,
+    the entries are diffed against the current ones and, if anything changed, `apply(entries)` builds the new
+    table and swaps it in with a single assignment, so lookups never see one half-built.
+    """
+    debounce = 300 # ms
+    _parsed = QtCore.Signal(int, object)
+
+    def __init__(self, path, parse, apply, describe=str, parent=None):
+        super(ConfigReloader, self).__init__(parent)
+        self.path = path
+        self._parse = parse
+        self._apply = apply
+        self._describe = describe
+        self._entries = None
+        self._generation = 0
+        self._watcher = QtCore.QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._changed)
+        self._watcher.directoryChanged.connect(self._directory_changed)
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(ConfigReloader.debounce)
+        self._timer.timeout.connect(self._reload)
+        self._parsed.connect(self._swap)
+        self._watch()
+
+    def load(self):
+        """ Parse and apply right now, on this thread """
+        self._generation += 1
+        self._swap(self._generation, self._parse_safely())
+
+    def _watch(self):
+        if os.path.exists(self.path) and self.path not in self._watcher.files():
+            self._watcher.addPath(self.path)
+        directory = os.path.dirname(self.path)
+        if directory not in self._watcher.directories():
+            self._watcher.addPath(directory)
+
+    def _changed(self, path=None):
+        self._timer.start()
+
+    def _directory_changed(self, directory):
+        # the file was replaced rather than written to
+        if self.path not in self._watcher.files(): self._timer.start()
+
+    def _reload(self):
+        if not os.path.exists(self.path): # deleted, or mid-replace: _directory_changed fires again once it's back
+            return
+        self._watch()
+        self._generation += 1
+        generation = self._generation
+        worker = threading.Thread(target=lambda: self._parsed.emit(generation, self._parse_safely()))
+        worker.daemon = True
+        worker.start()
+
+    def _parse_safely(self):
+        try: return self._parse(self.path)
+        except Exception:
+            traceback.print_exc()
+            return None
+
+    def _swap(self, generation, parsed):
+        if generation != self._generation or parsed is None: return
+        entries, errors = parsed
+        name = os.path.basename(self.path)
+        for error in errors: print error
+        if self._entries is not None:
+            if list(self._entries) == list(entries): return
+            old, new = set(self._entries), set(entries)
+            print "Reloading %s: %d added, %d removed" % (name, len(new - old), len(old - new))
+            for entry in entries:
+                if entry not in old: print "  + " + self._describe(entry)
+            for entry in self._entries:
+                if entry not in new: print "  - " + self._describe(entry)
+        self._apply(entries)
+        self._entries = entries
+
+
 def modifierstate2modifiers(modifierstate):
     modifiers = 0
     if modifierstate.shift:
@@ -478,4 +602,7 @@ def hideObsoleteOperators():
     hou.hscript("ophide Sop duplicate")
     hou.hscript("ophide Sop starburst")
     hou.hscript("ophide Sop pointmap")
-    hou.hscript("ophide Sop vex")
\ No newline at end of file
+    hou.hscript("ophide Sop vex")
+
+    import hcommander
+    hcommander.NodeTypeCatalog.invalidate()